@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""
+    Name: tpbench.py
+    Description:
+        tppy benchmark: crawl the trees of the test configs with each engine,
+        in process, and print the time spent and the tree nodes crawled
+        per second, the nodes being counted by the tree crawlers. Then
+        solve a puzzle with many solutions
+        with the crawler processes, for several solutions batch sizes, and
+        print the solutions throughput
+    Usage:
+        tpbench.py [engine | transport ...]
+"""
+
+import sys
+import threading
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import tpcrawler  # noqa: E402
+from tppieces import pieces_set  # noqa: E402
+from tppositions import PositionsStackCollection  # noqa: E402
+from tptests import test_configs  # noqa: E402
+
+bench_engines = [
+    "numpy",
+    "iterative",
+    "bitboard",
+    "cell",
+    "bitset",
+    "frontier"
+]
+
+bench_batch_sizes = [1, 64, 1024]
+
+transport_config = {
+    "rows": 6,
+    "columns": 8,
+    "square": 0,
+    "l_right": 2,
+    "l_left": 2,
+    "bar": 2,
+    "tee": 2,
+    "step_right": 2,
+    "step_left": 2,
+    "first": False,
+}
+
+pieces_args = [
+    ("square", "Square"),
+    ("l_right", "L Right"),
+    ("l_left", "L Left"),
+    ("bar", "Bar"),
+    ("tee", "Tee"),
+    ("step_right", "Step Right"),
+    ("step_left", "Step Left"),
+]
+
+
+class SolutionsQueue(list):
+    """Solutions queue of the crawlers, in process"""
+
+    def put(self, tree_path):
+        """Store a solution"""
+
+        self.append(tree_path)
+
+
+class SolutionsCount(object):
+    """Solutions collection of the crawlers collection, counting them"""
+
+    def __init__(self):
+        """Init the counter"""
+
+        self.count = 0
+
+    def add(self, tree_path):
+        """Count a solution"""
+
+        self.count += 1
+
+
+def parse(config):
+    """Board dimensions, pieces counts and first solution flag of a test
+    config
+    """
+
+    values = [value for value in config if value != "--first"]
+    args = {
+        name[2:].replace("-", "_"): int(value)
+        for name, value in zip(values[::2], values[1::2])
+    }
+    args["first"] = "--first" in config
+    return args
+
+
+def build(args):
+    """Positions of the config, ready to crawl"""
+
+    positions = PositionsStackCollection()
+    for arg, piece in pieces_args:
+        for _ in range(args[arg]):
+            positions.add(pieces_set[piece], args["rows"], args["columns"])
+    positions.optimize()
+    positions.break_symmetries()
+    return positions
+
+
+def crawl(args, engine):
+    """Crawl all the trees of the config with the engine, return the
+    solutions count
+    """
+
+    positions = build(args)
+    max_depth = len(positions) - 2
+    if max_depth < 0:
+        return None
+    crawlers = tpcrawler.CrawlersCollection(
+        positions, max_depth, args["first"], engine, jobs=1, split_depth=0
+    )
+    crawl_tree = tpcrawler.crawl_engines[engine]
+    queue = SolutionsQueue()
+    found = threading.Event()
+    # The tree crawlers of a first solution run leave the process stopping
+    tpcrawler.stopping = False
+    for tree_path in crawlers.roots():
+        if args["first"] and found.is_set():
+            break
+        crawl_tree(
+            crawlers.table,
+            tree_path,
+            crawlers.board(tree_path),
+            max_depth,
+            queue,
+            args["first"],
+            found
+        )
+    return len(queue)
+
+
+def transport(args, batch_size):
+    """Solve the config with the crawler processes of the cell engine,
+    return the solutions count and the time spent
+    """
+
+    positions = build(args)
+    crawlers = tpcrawler.CrawlersCollection(
+        positions,
+        len(positions) - 2,
+        False,
+        "cell",
+        batch_size=batch_size,
+        flush_interval=1.0
+    )
+    for tree_path in crawlers.roots():
+        crawlers.add(tree_path)
+    solutions = SolutionsCount()
+    start = perf_counter()
+    crawlers.start()
+    crawlers.get_solutions(solutions)
+    return solutions.count, perf_counter() - start
+
+
+def main():
+    """ Script main function """
+
+    benches = sys.argv[1:] or bench_engines + ["transport"]
+    engines = [engine for engine in benches if engine != "transport"]
+    if engines:
+        print(
+            "{: <6} {: <10} {: >9} {: >9} {: >12}"
+            .format("Config", "Engine", "Solutions", "Seconds", "Nodes/s")
+        )
+    for config_idx, config in enumerate(test_configs):
+        args = parse(config)
+        for engine in engines:
+            nodes = tpcrawler.crawled_nodes
+            start = perf_counter()
+            solutions = crawl(args, engine)
+            elapsed = perf_counter() - start
+            nodes = tpcrawler.crawled_nodes - nodes
+            if solutions is None:
+                continue
+            print(
+                "{: <6} {: <10} {: >9} {: >9.3f} {: >12}"
+                .format(
+                    config_idx,
+                    engine,
+                    solutions,
+                    elapsed,
+                    "{:.0f}".format(nodes / elapsed)
+                ),
+                flush=True
+            )
+    if "transport" not in benches:
+        return
+    print(
+        "{: <10} {: >9} {: >9} {: >11}"
+        .format("Batch size", "Solutions", "Seconds", "Solutions/s")
+    )
+    for batch_size in bench_batch_sizes:
+        solutions, elapsed = transport(transport_config, batch_size)
+        print(
+            "{: <10} {: >9} {: >9.3f} {: >11.0f}"
+            .format(batch_size, solutions, elapsed, solutions / elapsed),
+            flush=True
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,41 @@
         tppy testing
 """
 
+import re
 import sys
 from pathlib import Path
 from subprocess import run
 
 common_args = "--verbose --stats --images"
 
+# Engines only counting the tilings, which can't stop at the first solution
+counting_engines = ["memo", "profile"]
+
+# Solutions count of a crawler run: all the solutions, the first one or
+# none
+solutions_pattern = re.compile(
+    r"Found (\d+) unique solutions|(Puzzle solved !)$"
+    r"|(No solution found for the puzzle !)$",
+    re.MULTILINE
+)
+counted_pattern = re.compile(r"Counted (\d+) unique solutions")
+tilings_pattern = re.compile(
+    r"Counted (\d+) tilings, symmetrical ones included, (\d+) up to the "
+    r"board symmetries"
+)
+
+test_engines = [
+    "numpy",
+    "iterative",
+    "bitboard",
+    "cell",
+    "bitset",
+    "frontier",
+    "dlx",
+    "memo",
+    "profile"
+]
+
 test_configs = [
     [
         "--rows",
@@ -186,14 +215,112 @@ def main():
         print("Fatal: Can't find tppy.py script.")
         exit(1)
     interpreter = Path(sys.executable)
-    for config in test_configs:
-        command = "\"{}\" \"{}\" {} {}".format(
-            interpreter,
-            script,
-            common_args,
-            " ".join(config),
-        )
-        run(command, shell=True)
+    # Unique solutions of the crawlers, unique solutions counted by the
+    # crawlers (count only) and (tilings, classes) of the counting engines,
+    # by engine and config index
+    solutions = {}
+    counted = {}
+    tilings = {}
+    for engine in test_engines:
+        for config_idx, config in enumerate(test_configs):
+            if engine in counting_engines:
+                config = [arg for arg in config if arg != "--first"]
+            command = "\"{}\" \"{}\" {} --engine {} {}".format(
+                interpreter,
+                script,
+                common_args,
+                engine,
+                " ".join(config),
+            )
+            result = run(command, shell=True, capture_output=True, text=True)
+            print(result.stdout, end="")
+            print(result.stderr, end="", file=sys.stderr)
+            match = tilings_pattern.search(result.stdout)
+            if match:
+                tilings[engine, config_idx] = tuple(map(int, match.groups()))
+            match = solutions_pattern.search(result.stdout)
+            if match:
+                solutions[engine, config_idx] = (
+                    int(match.group(1)) if match.group(1)
+                    else 1 if match.group(2) else 0
+                )
+            if engine in counting_engines or "--first" in config:
+                continue
+            # Count only run: the unique solutions are counted by classes of
+            # symmetrical solutions, without collecting them
+            result = run(
+                command + " --count-only",
+                shell=True,
+                capture_output=True,
+                text=True
+            )
+            print(result.stdout, end="")
+            print(result.stderr, end="", file=sys.stderr)
+            match = counted_pattern.search(result.stdout)
+            if match:
+                counted[engine, config_idx] = int(match.group(1))
+    failures = []
+    for config_idx, config in enumerate(test_configs):
+        # The solutions of each crawler engine must agree with the numpy
+        # engine ones
+        for engine in test_engines:
+            if engine in counting_engines:
+                continue
+            if (engine, config_idx) not in solutions:
+                failures.append(
+                    "No solutions count for {} on config {}"
+                    .format(engine, config_idx)
+                )
+            elif solutions[engine, config_idx] != solutions.get(
+                ("numpy", config_idx)
+            ):
+                failures.append(
+                    "{} finds {} solutions on config {}, numpy {}".format(
+                        engine,
+                        solutions[engine, config_idx],
+                        config_idx,
+                        solutions.get(("numpy", config_idx))
+                    )
+                )
+            if "--first" in config:
+                continue
+            if counted.get((engine, config_idx)) != solutions.get(
+                (engine, config_idx)
+            ):
+                failures.append(
+                    "{} counts {} solutions on config {}, finds {}".format(
+                        engine,
+                        counted.get((engine, config_idx)),
+                        config_idx,
+                        solutions.get((engine, config_idx))
+                    )
+                )
+        # The profile counts must agree with the memo counts, and with the
+        # unique solutions of the crawlers: a class of symmetrical labels
+        # grids holds at least one class of symmetrical tilings
+        profile = tilings.get(("profile", config_idx))
+        if profile is None:
+            failures.append(
+                "No profile count for config {}".format(config_idx)
+            )
+            continue
+        if profile != tilings.get(("memo", config_idx)):
+            failures.append(
+                "Profile and memo counts differ for config {}"
+                .format(config_idx)
+            )
+        unique = solutions.get(("numpy", config_idx))
+        if unique is not None and "--first" not in config and not (
+            unique <= profile[1] <= profile[0]
+        ):
+            failures.append(
+                "Profile count {} doesn't match the {} unique solutions for "
+                "config {}".format(profile, unique, config_idx)
+            )
+    if failures:
+        print("\n".join(["Fatal: Engines disagree"] + failures))
+        exit(1)
+    print("All engines agree")
 
 
 if __name__ == "__main__":
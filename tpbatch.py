@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Batched transport of the solutions from the crawlers to the main process
+
+Name: tpbatch.py
+Comments:
+    A solution tree path is packed in a fixed width record: the (piece,
+    position) pairs of its nodes as unsigned 16 bits integers, all the
+    solutions having one node per piece. The crawler sends the records by
+    batches, one message of the solutions queue for many solutions, instead
+    of one pickled list per solution. When only the solutions count is
+    needed, the crawler sends a tally of its solutions by # of solutions in
+    their class instead.
+Classes:
+    SolutionsBatch: crawler side batch of solutions records
+    SolutionsTally: crawler side tally of solutions
+    SolutionsSink: crawler side drop of solutions
+Functions:
+    unpack: tree paths of a batch of solutions records
+Dependencies:
+    array
+    time
+"""
+
+from array import array
+from time import monotonic
+
+
+class SolutionsBatch(object):
+    """Crawler side batch of solutions records, sent on the solutions queue
+    when it's full or when its first solution is older than the flush
+    interval. Has the put method of the queue, to be given to the tree
+    crawlers in place of the queue.
+
+    Public members:
+        Properties:
+            solutions: integer - # of solutions added to the batches
+        Methods:
+            put: add a solution to the batch
+            expire: send the batch if its flush interval is over
+            flush: send the batch
+    Private members:
+        Attributes:
+            __queue: multiprocessing.Queue - solutions queue
+            __batch_size: integer - # of solutions of a full batch
+            __flush_interval: float - max # of seconds a solution waits in
+                the batch, checked when a solution is added or on expire
+            __records: array of unsigned short - solutions records
+            __count: integer - # of solutions in the batch
+            __solutions: integer - # of solutions added to the batches
+            __deadline: float - monotonic time to send the batch
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, queue, batch_size=1, flush_interval=0.0):
+        """Create an empty batch
+
+        Inputs:
+            queue: multiprocessing.Queue - solutions queue
+            batch_size: integer - # of solutions of a full batch
+            flush_interval: float - max # of seconds a solution waits in the
+                batch
+        """
+
+        self.__queue = queue
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__records = array("H")
+        self.__count = 0
+        self.__solutions = 0
+        self.__deadline = None
+
+    @property
+    def solutions(self):
+        """integer - # of solutions added to the batches"""
+
+        return self.__solutions
+
+    def put(self, tree_path):
+        """Add a solution to the batch, send the batch if it's full or if
+        the flush interval is over
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - solution
+                tree path
+        """
+
+        for node in tree_path:
+            self.__records.extend(node)
+        self.__count += 1
+        self.__solutions += 1
+        if self.__count == 1:
+            self.__deadline = monotonic() + self.__flush_interval
+        if self.__count >= self.__batch_size:
+            self.flush()
+        else:
+            self.expire()
+
+    def expire(self):
+        """Send the batch if its flush interval is over"""
+
+        if self.__count and monotonic() >= self.__deadline:
+            self.flush()
+
+    def flush(self):
+        """Send the batch, if not empty, on the solutions queue"""
+
+        if self.__count:
+            self.__queue.put(self.__records.tobytes())
+            self.__records = array("H")
+            self.__count = 0
+
+
+class SolutionsTally(object):
+    """Crawler side tally of solutions, by # of solutions in their class,
+    sent on the solutions queue when flushed. Has the put and flush methods
+    of a batch, to be given to the tree crawlers in its place.
+
+    Public members:
+        Properties:
+            solutions: integer - # of solutions added to the tallies
+        Methods:
+            put: add a solution to the tally
+            flush: send the tally
+    Private members:
+        Attributes:
+            __queue: multiprocessing.Queue - solutions queue
+            __classes: SolutionsClasses - classes of equal solutions
+            __tally: dict of integers - # of solutions by # of solutions in
+                their class
+            __solutions: integer - # of solutions added to the tallies
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, queue, classes):
+        """Create an empty tally
+
+        Inputs:
+            queue: multiprocessing.Queue - solutions queue
+            classes: SolutionsClasses - classes of equal solutions
+        """
+
+        self.__queue = queue
+        self.__classes = classes
+        self.__tally = {}
+        self.__solutions = 0
+
+    @property
+    def solutions(self):
+        """integer - # of solutions added to the tallies"""
+
+        return self.__solutions
+
+    def put(self, tree_path):
+        """Add a solution to the tally
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - solution
+                tree path
+        """
+
+        members = self.__classes.members(tree_path)
+        self.__tally[members] = self.__tally.get(members, 0) + 1
+        self.__solutions += 1
+
+    def flush(self):
+        """Send the tally, if not empty, on the solutions queue, as a tuple
+        of integer tuples (members, count)
+        """
+
+        if self.__tally:
+            self.__queue.put(tuple(self.__tally.items()))
+            self.__tally = {}
+
+
+class SolutionsSink(object):
+    """Crawler side drop of solutions, when only the tree nodes crawled are
+    needed. Has the put method of the queue, to be given to the tree
+    crawlers in place of the queue.
+
+    Public members:
+        Methods:
+            put: drop a solution
+    """
+
+    def put(self, tree_path):
+        """Drop a solution
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - solution
+                tree path
+        """
+
+        pass
+
+
+def unpack(records, width):
+    """Tree paths of a batch of solutions records
+
+    Inputs:
+        records: bytes - solutions records sent by a SolutionsBatch
+        width: integer - # of nodes of a solution tree path
+    Return: list of list of integer tuples (piece, position) - solutions
+        tree paths
+    """
+
+    nodes = array("H")
+    nodes.frombytes(records)
+    size = 2 * width
+    return [
+        [
+            (nodes[node], nodes[node + 1])
+            for node in range(start, start + size, 2)
+        ]
+        for start in range(0, len(nodes), size)
+    ]
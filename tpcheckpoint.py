@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Checkpoint file of a long running solve
+
+Name: tpcheckpoint.py
+Comments:
+    The checkpoint file is a JSON document with the puzzle configuration and
+    engine of the solve, the tree paths of the crawler tasks not finished
+    yet and the tree paths of the solutions found so far. It's written in a
+    temporary file then renamed, so a crash while saving keeps the previous
+    checkpoint.
+Classes:
+    Checkpoint: periodic save and load of the solve state
+Attributes:
+    CHECKPOINT_INTERVAL: const float - default # of seconds between two
+        saves
+Dependencies:
+    json
+    os
+    time
+    tperrors
+"""
+
+import json
+import os
+from time import monotonic
+
+from tperrors import TalosFileSystemError
+
+CHECKPOINT_INTERVAL = 60.0
+
+
+class Checkpoint(object):
+    """Periodic save and load of the solve state: pending crawler tasks and
+    solutions found
+
+    Public members:
+        Methods:
+            due: test if the checkpoint interval is over
+            save: save the solve state
+            load: load the solve state
+    Private members:
+        Attributes:
+            __path: string - checkpoint file path
+            __config: string - puzzle configuration and engine of the solve
+            __interval: float - # of seconds between two saves
+            __deadline: float - monotonic time of the next save
+    Special methods:
+        __init__: override object constructor
+    Exceptions:
+        TalosFileSystemError: error in saving or loading the checkpoint
+    """
+
+    def __init__(self, path, config, interval=CHECKPOINT_INTERVAL):
+        """Override object constructor
+
+        Inputs:
+            path: string - checkpoint file path
+            config: string - puzzle configuration and engine of the solve
+            interval: float, optional, CHECKPOINT_INTERVAL - # of seconds
+                between two saves
+        """
+
+        self.__path = path
+        self.__config = config
+        self.__interval = interval
+        self.__deadline = monotonic() + interval
+
+    def due(self):
+        """Test if the checkpoint interval is over since the last save
+
+        Return: boolean - True if the solve state has to be saved
+        """
+
+        return monotonic() >= self.__deadline
+
+    def save(self, tasks, solutions):
+        """Save the solve state, replacing the previous checkpoint
+
+        Inputs:
+            tasks: list of list of integer tuples (piece, position) - tree
+                paths of the crawler tasks not finished
+            solutions: list of list of integer tuples (piece, position) -
+                tree paths of the solutions found
+        Exceptions:
+            TalosFileSystemError: error in saving the checkpoint
+        """
+
+        state = {
+            "config": self.__config,
+            "tasks": tasks,
+            "solutions": solutions
+        }
+        temporary = self.__path + ".tmp"
+        try:
+            with open(temporary, "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, self.__path)
+        except OSError as err:
+            message = "Error: Can't save checkpoint file " + self.__path
+            raise TalosFileSystemError(message, err)
+        self.__deadline = monotonic() + self.__interval
+
+    def load(self):
+        """Load the solve state of the checkpoint
+
+        Return: tuple (tasks, solutions) of list of list of integer tuples
+            (piece, position) - tree paths of the crawler tasks not finished
+            and of the solutions found, None if there is no checkpoint file
+        Exceptions:
+            TalosFileSystemError: error in loading the checkpoint, or
+                checkpoint of another puzzle or engine
+        """
+
+        if not os.path.isfile(self.__path):
+            return None
+        try:
+            with open(self.__path) as f:
+                state = json.load(f)
+            if state["config"] != self.__config:
+                raise ValueError(
+                    "checkpoint of puzzle and engine " + state["config"]
+                )
+            return tuple(
+                [[tuple(node) for node in tree_path]
+                 for tree_path in state[key]]
+                for key in ("tasks", "solutions")
+            )
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            message = "Error: Can't resume from checkpoint file " + self.__path
+            raise TalosFileSystemError(message, err)
@@ -0,0 +1,515 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Distributed solve: a coordinator serving the crawler tasks to workers
+over TCP
+
+Name: tpcluster.py
+Comments:
+    The coordinator splits the trees as the crawlers pool does and serves
+    the subtrees roots (tasks) on a TCP socket. A worker connection first
+    receives the crawler setup (engine, positions table, max depth, first
+    solution flag, batching and classes of solutions when only counting
+    them), then one task at a time: the worker crawls
+    it with the tree crawler of the engine, sends back its solutions by
+    batches of records, then the task index, which asks for the next task.
+    The task of a lost connection is served again to another worker, the
+    solutions it already sent being dropped as duplicates by the solutions
+    collection. Connections are authenticated with a shared key (HMAC
+    challenge of multiprocessing.connection), in a thread per connection
+    with a timeout, the messages being pickled: only serve on a trusted
+    network.
+    The trees are split for the # of worker processes expected, as for a
+    crawlers pool, or down to the split depth of the crawlers pool.
+Classes:
+    Coordinator: serve the crawler tasks to the workers
+    ConnectionQueue: put side of a worker connection
+Functions:
+    worker: crawl the tasks served by a coordinator
+    worker_process: worker process, printing its errors
+    start_workers: start worker processes
+Attributes:
+    AUTHKEY: const string - default authentication key of the connections
+    SERVE_JOBS: const integer - default # of worker processes expected by
+        the coordinator
+    HANDSHAKE_TIMEOUT: const float - seconds a connection has to complete
+        its authentication
+Dependencies:
+    collections
+    multiprocessing
+    os
+    queue
+    socket
+    threading
+    tpbatch
+    tpcrawler
+    tperrors
+"""
+
+import os
+import socket
+import threading as td
+from collections import deque
+from multiprocessing import AuthenticationError, Process
+from multiprocessing.connection import (
+    Client,
+    Listener,
+    answer_challenge,
+    deliver_challenge,
+    wait
+)
+from queue import Empty, Queue
+
+from tpbatch import SolutionsBatch, SolutionsTally, unpack
+from tpcrawler import COLLECTOR_TIMEOUT, crawl_engines, usable_cpu_count
+from tperrors import TalosNetworkError
+
+AUTHKEY = "talospuzzle"
+SERVE_JOBS = 64
+HANDSHAKE_TIMEOUT = 10.0
+
+
+class Coordinator(object):
+    """Serve the crawler tasks to the workers connected on a TCP socket and
+    collect their solutions
+
+    Public members:
+        Methods:
+            serve: serve the tasks until they are all finished
+        Properties:
+            lost: integer - # of tasks served again after a lost connection
+            incomplete: boolean - some tasks were not finished, the
+                solutions found are partial
+    Private members:
+        Attributes:
+            __crawlers: CrawlersCollection - crawlers pool, with the tree
+                roots added, splitting the trees and giving the boards
+            __setup: tuple - crawler setup sent to each worker: engine
+                name, positions table, max depth, first solution flag,
+                batch size, flush interval and classes of solutions
+            __width: integer - # of nodes of a solution tree path
+            __first: boolean - stop at first solution found
+            __address: tuple (string, integer) - host and port to listen on
+            __authkey: bytes - authentication key of the connections
+            __tasks: collections.deque of integers - indexes of the tasks to
+                serve
+            __pending: dict of list of integer tuples (piece, position) -
+                subtrees roots of the tasks not finished, by task index
+            __workers: dict of integers - index of the task served to each
+                worker connection, None if the worker waits for a task
+            __tallies: dict of list of tuples - solutions tallies received
+                for the tasks not finished, by task index
+            __lost: integer - # of tasks served again
+            __verbose: boolean - print the workers connections and losses
+            __jobs: integer - # of worker processes expected, to split the
+                trees
+        Methods:
+            __accept: accept the workers connections, in a thread
+            __authenticate: authenticate a worker connection, in a thread
+            __connect: send the setup and a first task to a new worker
+            __next: serve the next task to a worker
+            __lose: close a lost worker connection, serve its task again
+    Special methods:
+        __init__: override object constructor
+    Exceptions:
+        TalosNetworkError: error in listening on the address
+    """
+
+    def __init__(self, crawlers, engine, max_depth, first, address,
+                 authkey=AUTHKEY, batch_size=1, flush_interval=0.0,
+                 classes=None, jobs=None):
+        """Override object constructor
+
+        Inputs:
+            crawlers: CrawlersCollection - crawlers pool, with the tree roots
+                added
+            engine: string - name of the crawler engine (see crawl_engines)
+            max_depth: integer - max depth for tree crawling
+            first: boolean - stop at first solution found
+            address: tuple (string, integer) - host and port to listen on
+            authkey: string, optional, AUTHKEY - authentication key of the
+                connections
+            batch_size: integer, optional, 1 - # of solutions sent together
+                by a worker
+            flush_interval: float, optional, 0.0 - max # of seconds a
+                solution waits in a worker batch
+            classes: SolutionsClasses, optional, None - classes of equal
+                solutions, for the workers to only count the solutions
+            jobs: integer, optional, None - # of worker processes expected,
+                SERVE_JOBS if None
+        """
+
+        self.__crawlers = crawlers
+        self.__setup = (
+            engine,
+            crawlers.table,
+            max_depth,
+            first,
+            batch_size,
+            flush_interval,
+            classes
+        )
+        self.__width = max_depth + 2
+        self.__first = first
+        self.__address = address
+        self.__authkey = authkey.encode()
+        self.__tasks = deque()
+        self.__pending = {}
+        self.__workers = {}
+        self.__tallies = {}
+        self.__lost = 0
+        self.__verbose = False
+        self.__jobs = jobs or SERVE_JOBS
+
+    @property
+    def lost(self):
+        """integer - # of tasks served again after a lost connection"""
+
+        return self.__lost
+
+    @property
+    def incomplete(self):
+        """boolean - some tasks were not finished (serve interrupted), the
+        solutions found are partial (not relevant when stopping at first
+        solution)
+        """
+
+        return not self.__first and bool(self.__pending)
+
+    def __accept(self, listener, connections):
+        """Accept the workers connections until the listener is closed, and
+        authenticate each of them in its own thread: a client stalling
+        during the authentication doesn't block the other ones. Designed to
+        be ran in a thread.
+
+        Inputs:
+            listener: multiprocessing.connection.Listener - listener of the
+                coordinator, without authentication
+        Outputs:
+            connections: queue.Queue - workers connections authenticated
+        """
+
+        while True:
+            try:
+                connection = listener.accept()
+            except OSError:
+                # Listener closed
+                break
+            td.Thread(
+                target=self.__authenticate,
+                args=(connection, listener.last_accepted, connections),
+                daemon=True
+            ).start()
+
+    def __authenticate(self, connection, client, connections):
+        """Authenticate a worker connection (HMAC challenges both ways),
+        dropping it on a wrong key or if it isn't done in HANDSHAKE_TIMEOUT
+        seconds. Designed to be ran in a thread.
+
+        Inputs:
+            connection: multiprocessing.connection.Connection - worker
+                connection
+            client: tuple (string, integer) - worker host and port
+        Outputs:
+            connections: queue.Queue - workers connections authenticated
+        """
+
+        def timeout():
+            # Shut the socket down, the blocked handshake reads end
+            try:
+                with socket.socket(fileno=os.dup(connection.fileno())) as s:
+                    s.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+        timer = td.Timer(HANDSHAKE_TIMEOUT, timeout)
+        timer.start()
+        try:
+            deliver_challenge(connection, self.__authkey)
+            answer_challenge(connection, self.__authkey)
+        except (AuthenticationError, EOFError, OSError):
+            # Wrong key or stalled client, the client is dropped
+            connection.close()
+            return
+        finally:
+            timer.cancel()
+        connections.put((connection, client))
+
+    def __connect(self, connection, client):
+        """Send the crawler setup and a first task to a new worker
+
+        Inputs:
+            connection: multiprocessing.connection.Connection - worker
+                connection
+            client: tuple (string, integer) - worker host and port
+        """
+
+        try:
+            connection.send(self.__setup)
+        except OSError:
+            connection.close()
+            return
+        if self.__verbose:
+            print("Info: Worker connected from {}:{}".format(*client))
+        self.__workers[connection] = None
+        self.__next(connection)
+
+    def __next(self, connection):
+        """Serve the next task to a worker, or let it wait for a task if
+        there is none to serve
+
+        Inputs:
+            connection: multiprocessing.connection.Connection - worker
+                connection
+        """
+
+        task_idx = None
+        if self.__tasks:
+            task_idx = self.__tasks.popleft()
+        self.__workers[connection] = task_idx
+        if task_idx is None:
+            return
+        tree_path = self.__pending[task_idx]
+        try:
+            connection.send(
+                (task_idx, tree_path, self.__crawlers.board(tree_path))
+            )
+        except OSError:
+            self.__lose(connection)
+
+    def __lose(self, connection):
+        """Close a lost worker connection and serve its task again to a
+        waiting worker, if any
+
+        Inputs:
+            connection: multiprocessing.connection.Connection - worker
+                connection
+        """
+
+        task_idx = self.__workers.pop(connection)
+        connection.close()
+        # The tallies of the task are sent again by its next worker
+        self.__tallies.pop(task_idx, None)
+        if task_idx is None or task_idx not in self.__pending:
+            return
+        self.__lost += 1
+        self.__tasks.appendleft(task_idx)
+        if self.__verbose:
+            print("Info: Worker lost, task {} served again".format(task_idx))
+        for waiting, waiting_task in list(self.__workers.items()):
+            if waiting_task is None:
+                self.__next(waiting)
+                break
+
+    def serve(self, solutions, verbose=False):
+        """Split the trees and serve the tasks to the workers, until all
+        the tasks are finished (or the first solution is found), or until a
+        keyboard interrupt. Add the solutions sent by the workers to the
+        solutions collection.
+
+        Inputs:
+            verbose: boolean, optional, False - print the workers
+                connections and losses
+        Outputs:
+            solutions: SolutionsCollection, puzzle collection of solutions
+        Exceptions:
+            TalosNetworkError: error in listening on the address
+        """
+
+        self.__verbose = verbose
+        self.__pending = dict(enumerate(self.__crawlers.split(self.__jobs)))
+        self.__tasks = deque(self.__pending)
+        try:
+            # The connections are authenticated out of the listener
+            listener = Listener(self.__address)
+        except OSError as err:
+            message = "Error: Can't listen on {}:{}".format(*self.__address)
+            raise TalosNetworkError(message, err)
+        if verbose:
+            print(
+                "Info: Serving {} tasks on {}:{}"
+                .format(len(self.__pending), *self.__address),
+                flush=True
+            )
+        connections = Queue()
+        td.Thread(
+            target=self.__accept,
+            args=(listener, connections),
+            daemon=True
+        ).start()
+        try:
+            while self.__pending and not (self.__first and len(solutions)):
+                # New workers
+                while True:
+                    try:
+                        self.__connect(*connections.get_nowait())
+                    except Empty:
+                        break
+                for connection in wait(
+                    list(self.__workers),
+                    timeout=COLLECTOR_TIMEOUT
+                ):
+                    try:
+                        message = connection.recv()
+                    except (EOFError, OSError):
+                        self.__lose(connection)
+                        continue
+                    if isinstance(message, int):
+                        # The tallies of a task are counted once it is
+                        # finished, not to count twice the ones of a task
+                        # served again
+                        tallies = self.__tallies.pop(message, [])
+                        if self.__pending.pop(message, None) is not None:
+                            for tally in tallies:
+                                solutions.add_tally(tally)
+                        self.__next(connection)
+                    elif isinstance(message, tuple):
+                        self.__tallies.setdefault(
+                            self.__workers[connection], []
+                        ).append(message)
+                    else:
+                        for tree_path in unpack(message, self.__width):
+                            solutions.add(tree_path)
+        except KeyboardInterrupt:
+            # The solutions found are kept, the solve is incomplete
+            pass
+        finally:
+            # The workers end on a 'None' task or on the connection close
+            listener.close()
+            for connection in self.__workers:
+                try:
+                    connection.send(None)
+                except OSError:
+                    pass
+                connection.close()
+            self.__workers = {}
+
+
+class ConnectionQueue(object):
+    """Put side of a worker connection, given as queue to a solutions batch
+
+    Public members:
+        Methods:
+            put: send an object on the connection
+    Private members:
+        Attributes:
+            __connection: multiprocessing.connection.Connection - worker
+                connection
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, connection):
+        """Override object constructor
+
+        Inputs:
+            connection: multiprocessing.connection.Connection - worker
+                connection
+        """
+
+        self.__connection = connection
+
+    def put(self, obj):
+        """Send an object on the connection
+
+        Inputs:
+            obj: picklable object - object to send
+        """
+
+        self.__connection.send(obj)
+
+
+def worker(address, authkey=AUTHKEY):
+    """Connect to a coordinator and crawl the tasks it serves, with the tree
+    crawler of its engine, until it has no more task or closes the
+    connection
+
+    Inputs:
+        address: tuple (string, integer) - coordinator host and port
+        authkey: string, optional, AUTHKEY - authentication key of the
+            connection
+    Exceptions:
+        TalosNetworkError: error in connecting to the coordinator
+    """
+
+    try:
+        connection = Client(address, authkey=authkey.encode())
+    except (OSError, AuthenticationError) as err:
+        message = "Error: Can't connect to coordinator {}:{}".format(*address)
+        raise TalosNetworkError(message, err)
+    with connection:
+        try:
+            (
+                engine,
+                table,
+                max_depth,
+                first,
+                batch_size,
+                flush_interval,
+                classes
+            ) = connection.recv()
+            crawl_tree = crawl_engines[engine]
+            if classes is None:
+                batch = SolutionsBatch(
+                    ConnectionQueue(connection),
+                    batch_size,
+                    flush_interval
+                )
+            else:
+                batch = SolutionsTally(ConnectionQueue(connection), classes)
+            found = td.Event()
+            task = connection.recv()
+            while task is not None:
+                task_idx, tree_path, board = task
+                crawl_tree(
+                    table,
+                    tree_path,
+                    board,
+                    max_depth,
+                    batch,
+                    first,
+                    found
+                )
+                # The solutions of the task are sent before its index
+                batch.flush()
+                connection.send(task_idx)
+                task = connection.recv()
+        except (EOFError, OSError):
+            # Coordinator ended
+            pass
+
+
+def worker_process(address, authkey=AUTHKEY):
+    """Worker process: worker with its errors printed
+
+    Inputs:
+        address: tuple (string, integer) - coordinator host and port
+        authkey: string, optional, AUTHKEY - authentication key of the
+            connection
+    """
+
+    try:
+        worker(address, authkey)
+    except TalosNetworkError as err:
+        print(err.message, " with system error: ", err.syserror)
+
+
+def start_workers(address, authkey=AUTHKEY, jobs=None):
+    """Start worker processes connected to a coordinator and wait for their
+    end
+
+    Inputs:
+        address: tuple (string, integer) - coordinator host and port
+        authkey: string, optional, AUTHKEY - authentication key of the
+            connections
+        jobs: integer, optional, None - # of worker processes, usable CPU
+            count if None
+    """
+
+    workers = [
+        Process(target=worker_process, args=(address, authkey))
+        for _ in range(jobs or usable_cpu_count())
+    ]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
@@ -4,51 +4,180 @@
 
 Name: tpcrawler.py
 Classes:
-    CrawlersCollection: collection of crawler processes
+    CrawlersCollection: pool of crawler processes
 Functions:
+    usable_cpu_count: # of CPUs usable by the application
+    crawler_worker: crawler process, crawling the trees of a tasks queue
     crawl_tree: recursive tree crawler process
+    crawl_tree_bitboard: recursive tree crawler process on bitmasks
+    crawl_tree_cell: recursive tree crawler process filling the first empty
+        cell
+    crawl_tree_bitset: recursive tree crawler process on compatible
+        positions bitsets
+    crawl_tree_iterative: iterative tree crawler process with an explicit
+        stack
+    crawl_tree_frontier: breadth first tree crawler process on numpy
+        arrays of bitmasks, then depth first
+Attributes:
+    TASKS_PER_CRAWLER: const integer - # of tasks per crawler process to
+        reach when splitting the trees automatically
+    COLLECTOR_TIMEOUT: const float - seconds the solutions collector waits
+        on the queue before checking that the crawlers are alive
+    PUBLISH_INTERVAL: const float - seconds between two publications of the
+        counters of a crawler process
+    ESTIMATE_TIME: const float - seconds of random probes of the tree size
+        estimate
+    CALIBRATION_TIME: const float - seconds of crawling to measure the
+        nodes rate of the engine
+    FRONTIER_MEMORY: const integer - default memory budget in megabytes of
+        the breadth first levels of the frontier engine
+    FRONTIER_PAIR_BYTES: const integer - bytes used by the frontier engine
+        to test a position against a partial board
+    FRONTIER_NODE_BYTES: const integer - bytes of a node of the frontier,
+        besides its positions indexes
+    COUNTERS: const tuple of strings - counters of each crawler process:
+        tree nodes crawled, branches cut by the dead regions pruning and
+        solutions found
+    crawl_engines: static dict of functions - tree crawlers by engine name
+    crawled_nodes: integer - # of tree nodes crawled by the crawler process
+    stopping: boolean - the crawler process has to stop, its tree crawlers
+        exit immediately
+    iterative_stack: tuple - explicit stack of the iterative tree crawler,
+        allocated once per positions collection: positions collection,
+        positions and tree nodes of each piece, next position to combine
+        at each level and maximum of the board
 Dependencies:
+    math
+    os
+    signal
+    statistics
     threading
     multiprocessing
     queue
+    time
     numpy
+    tpbatch
 """
 
+import os
+import signal
 import threading as td
-from multiprocessing import Event, Process, Queue
+from math import ceil
+from multiprocessing import Event, Process, Queue, RawArray
 from queue import Empty
+from statistics import fmean, stdev
+from time import monotonic
 
 import numpy
 
+from tpbatch import SolutionsBatch, SolutionsSink, SolutionsTally, unpack
+
+TASKS_PER_CRAWLER = 64
+COLLECTOR_TIMEOUT = 1.0
+PUBLISH_INTERVAL = 0.5
+ESTIMATE_TIME = 5.0
+CALIBRATION_TIME = 2.0
+FRONTIER_MEMORY = 64
+FRONTIER_PAIR_BYTES = 10
+FRONTIER_NODE_BYTES = 24
+COUNTERS = ("nodes", "pruned", "solutions")
+
+crawled_nodes = 0
+stopping = False
+iterative_stack = None
+
 
 class CrawlersCollection(object):
-    """Tree crawler processes collection
+    """Tree crawler processes pool. The trees are split in subtrees, down to
+    a given depth, and each subtree is a task, crawled by the first
+    available crawler process of the pool.
 
     Public members:
         Methods:
-            add: add a crawler to the collection, from the given tree path
-            start: start all the crawlers from the collection
+            roots: tree roots of the engine
+            board: board of the engine for a tree path
+            add: add a tree root to the crawlers tasks
+            split: split the tree roots in subtrees roots (tasks)
+            start: start the crawlers pool
             get_solutions: get solutions from the queue
+            stop: ask the crawlers to stop
+            estimate: estimate the # of tree nodes to crawl
+            calibrate: measure the nodes rate of the engine
+        Properties:
+            pending: list of list of integer tuples (piece, position) -
+                subtrees roots of the tasks not finished
+            table: positions table given to the crawlers for the engine
+            pruned: integer - # of branches cut by the dead regions pruning
+            counters: dict of integers - sums of the crawlers counters
+                (COUNTERS), as last published
+            tasks_count: integer - # of tasks queued
+            halted: string - reason of the crawlers stop before the end of
+                the crawling (timeout, nodes, solutions or interrupt), None
+                if not halted
+            incomplete: boolean - the crawling didn't cover all the trees,
+                the solutions found are partial
     Private members:
         Attributes:
             __positions: PositionsStackCollection - puzzle collection of
                 positions
+            __engine: string - name of the crawler engine
+            __table: PositionsStackCollection, tuple (masks, copies,
+                regions), tuple (CellsIndex, regions) or
+                PositionsCompatibility - positions table given to the
+                crawlers for the engine
+            __regions: DeadRegions - dead regions pruning, None if none
             __max_depth: integer - max depth for tree crawling
             __first: boolean - stop at first solution found
-            __queue: multiprocessing.Queue - communication queue for crawlers
-            __found: multiprocessing.Event - solution found event for crawlers
+            __jobs: integer - # of crawler processes
+            __pin: boolean - pin each crawler process to one CPU
+            __split_depth: integer - # of levels to split the trees on, None
+                for automatic
+            __roots: list of list of integer tuples (piece, position) - tree
+                roots to crawl
+            __tasks: multiprocessing.Queue - subtrees roots to crawl
+            __pending: dict of list of integer tuples (piece, position) -
+                subtrees roots of the tasks not finished, by task index
+            __queue: multiprocessing.Queue - communication queue for
+                crawlers: solutions batches, finished tasks indexes and
+                crawlers ends
+            __found: multiprocessing.Event - stop event for crawlers, set on
+                first solution found or when the solve budget is reached
+            __counters: multiprocessing.RawArray - counters (COUNTERS) of
+                each crawler, one slot per crawler, written by the crawler
+                only
+            __tasks_count: integer - # of tasks queued
             __crawlers: list of multiprocessing.Process - list of crawler
                 processes
-            __supervisor: threading.Thread - thread waiting for crawlers
-                termination
-            __done: threading.Event - all crawlers terminated event
+            __shared: SharedPositions - positions table of the numpy engines
+                in shared memory, while the crawlers run
+            __batch_size: integer - # of solutions of a crawler batch
+            __flush_interval: float - max # of seconds a solution waits in
+                a crawler batch
+            __timeout: float - max # of seconds of crawling, None if none
+            __max_nodes: integer - max # of tree nodes crawled, None if none
+            __max_solutions: integer - max # of solutions, None if none
+            __halted: string - reason of the crawlers stop, None if none
+            __classes: SolutionsClasses - classes of equal solutions, for
+                the crawlers to send tallies instead of solutions, None to
+                send the solutions
         Methods:
-            __supervise: watch all crawler processes for termination
+            __save: save the tasks not finished and the solutions in a
+                checkpoint
+            __report: report the tasks finished and the crawlers counters
+            __budget: stop the crawlers if the solve budget is reached
+            __mask: bitmask of the board of a tree path
+            __children: valid child tree paths of a tree path
+            __crawled: child tree paths of a tree path crawled by the
+                engine
     Special methods:
         __init__: override object constructor
     """
 
-    def __init__(self, positions, max_depth, first):
+    def __init__(self, positions, max_depth, first, engine="numpy",
+                 jobs=None, pin=False, split_depth=None, regions=None,
+                 batch_size=1, flush_interval=0.0, timeout=None,
+                 max_nodes=None, max_solutions=None, classes=None,
+                 frontier_memory=FRONTIER_MEMORY):
         """Override object constructor
 
         Inputs:
@@ -56,83 +185,743 @@ class CrawlersCollection(object):
                 positions
             max_depth: integer - max depth for tree crawling
             first: boolean - stop at first solution found
+            engine: string - name of the crawler engine (see crawl_engines)
+            jobs: integer, optional, None - # of crawler processes, usable
+                CPU count if None
+            pin: boolean - pin each crawler process to one CPU
+            split_depth: integer, optional, None - # of levels to split the
+                trees on, split until TASKS_PER_CRAWLER tasks per crawler if
+                None
+            regions: DeadRegions, optional, None - dead regions pruning for
+                the bitboard, cell and frontier engines
+            batch_size: integer, optional, 1 - # of solutions sent together
+                by a crawler
+            flush_interval: float, optional, 0.0 - max # of seconds a
+                solution waits in a crawler batch
+            timeout: float, optional, None - max # of seconds of crawling,
+                no limit if None
+            max_nodes: integer, optional, None - max # of tree nodes
+                crawled, no limit if None
+            max_solutions: integer, optional, None - max # of solutions, no
+                limit if None
+            classes: SolutionsClasses, optional, None - classes of equal
+                solutions, for the crawlers to only count the solutions
         """
 
         self.__positions = positions
+        self.__engine = engine
+        # Bitboard crawlers only need the positions bitmasks and the copies
+        # of pieces, cell crawlers the positions by anchor cell and bitset
+        # crawlers the compatible positions of each pair of pieces
+        self.__regions = regions
+        if engine == "bitboard":
+            self.__table = (positions.masks, positions.copies, regions)
+        elif engine == "frontier":
+            # The breadth first levels need boards of 64 cells at most
+            budget = None
+            if max(
+                (mask.bit_length() for masks in positions.masks
+                 for mask in masks),
+                default=0
+            ) <= 64:
+                budget = frontier_memory << 20
+            self.__table = (
+                [numpy.array(masks, dtype=numpy.uint64)
+                 for masks in positions.masks],
+                positions.masks,
+                positions.copies,
+                regions,
+                budget
+            )
+        elif engine == "cell":
+            self.__table = (positions.cells_index(), regions)
+        elif engine == "bitset":
+            self.__table = positions.compatibility()
+            self.__regions = None
+        else:
+            self.__table = positions
+            self.__regions = None
         self.__max_depth = max_depth
         self.__first = first
+        self.__jobs = jobs or usable_cpu_count()
+        self.__pin = pin
+        self.__split_depth = split_depth
+        self.__roots = []
+        self.__tasks = Queue()
+        self.__pending = {}
         self.__queue = Queue()
         self.__found = Event()
+        self.__counters = RawArray("Q", 0)
+        self.__tasks_count = 0
         self.__crawlers = []
-        self.__supervisor = None
-        self.__done = td.Event()
+        self.__shared = None
+        self.__batch_size = batch_size
+        self.__flush_interval = flush_interval
+        self.__timeout = timeout
+        self.__max_nodes = max_nodes
+        self.__max_solutions = max_solutions
+        self.__halted = None
+        self.__classes = classes
 
-    def __supervise(self):
-        """Send 'done' event after all crawlers terminate"""
+    @property
+    def table(self):
+        """Positions table given to the crawlers for the engine"""
 
-        for crawler in self.__crawlers:
-            crawler.join()
-        self.__done.set()
+        return self.__table
 
-    def add(self, tree_path):
-        """Add a tree crawler to the collection
+    @property
+    def counters(self):
+        """dict of integers - sums of the crawlers counters (COUNTERS), as
+        last published by the crawlers
+        """
+
+        return {
+            name: sum(self.__counters[counter::len(COUNTERS)])
+            for counter, name in enumerate(COUNTERS)
+        }
+
+    @property
+    def pruned(self):
+        """integer - # of branches cut by the dead regions pruning"""
+
+        return self.counters["pruned"]
+
+    @property
+    def tasks_count(self):
+        """integer - # of tasks queued"""
+
+        return self.__tasks_count
+
+    @property
+    def pending(self):
+        """list of list of integer tuples (piece, position) - subtrees roots
+        of the tasks not finished, in tasks order
+        """
+
+        return list(self.__pending.values())
+
+    @property
+    def halted(self):
+        """string - reason of the crawlers stop before the end of the
+        crawling (timeout, nodes, solutions or interrupt), None if not halted
+        """
+
+        return self.__halted
+
+    @property
+    def incomplete(self):
+        """boolean - the crawling didn't cover all the trees, the solutions
+        found are partial (not relevant when stopping at first solution)
+        """
+
+        return bool(self.__halted) or (
+            not self.__first and bool(self.__pending)
+        )
+
+    def stop(self, reason):
+        """Ask the crawlers to stop: they drop their current task and the
+        remaining ones, send the solutions already found and end
 
         Inputs:
-            tree_path: list of integer tuples (row, col) - tree root
+            reason: string - reason of the stop (timeout, nodes, solutions
+                or interrupt)
         """
 
-        # Get the tree root position
-        piece_idx = tree_path[0][0]
-        position_idx = tree_path[0][1]
+        if not self.__halted:
+            self.__halted = reason
+        self.__found.set()
+
+    def __budget(self, solutions, deadline):
+        """Stop the crawlers if the solve budget is reached
+
+        Inputs:
+            solutions: SolutionsCollection, puzzle collection of solutions
+            deadline: float - monotonic time of the timeout, None if none
+        """
+
+        if self.__halted:
+            return
+        if deadline is not None and monotonic() >= deadline:
+            self.stop("timeout")
+        elif (self.__max_nodes is not None
+              and self.counters["nodes"] >= self.__max_nodes):
+            self.stop("nodes")
+        elif (self.__max_solutions is not None
+              and len(solutions) >= self.__max_solutions):
+            self.stop("solutions")
+
+    def __save(self, checkpoint, solutions):
+        """Save the tasks not finished and the solutions in the checkpoint
+
+        Inputs:
+            checkpoint: Checkpoint - checkpoint of the solve
+            solutions: SolutionsCollection, puzzle collection of solutions
+        Exceptions:
+            TalosFileSystemError: error in saving the checkpoint
+        """
+
+        checkpoint.save(
+            self.pending,
+            [solution.path for solution in solutions]
+        )
+
+    def __report(self, progress):
+        """Report the tasks finished and the crawlers counters
+
+        Inputs:
+            progress: Progress - progress of the solve
+        Exceptions:
+            TalosFileSystemError: error in saving the progress
+        """
+
+        progress.report(
+            self.__tasks_count - len(self.__pending),
+            self.__tasks_count,
+            self.counters
+        )
+
+    def __mask(self, tree_path):
+        """Bitmask of the board of the given tree path
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - tree path
+        Return: integer - board bitmask
+        """
+
+        mask = 0
+        for piece_idx, position_idx in tree_path:
+            mask |= self.__positions[piece_idx].masks[position_idx]
+        return mask
+
+    def board(self, tree_path):
+        """Board of the engine for the given tree path
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - tree path
+        Return: numpy array, integer or list of integers - board, board
+            bitmask or bitsets of the valid positions of the remaining pieces
+        """
+
+        if self.__engine == "bitset":
+            return self.__table.candidates(tree_path)
+        if self.__engine not in ("numpy", "iterative"):
+            return self.__mask(tree_path)
+        piece_idx, position_idx = tree_path[0]
         board = numpy.copy(self.__positions[piece_idx][position_idx])
-        # Create the crawler process and append it to the list
-        crawler = Process(
-            target=crawl_tree,
-            args=(
-                self.__positions,
+        for piece_idx, position_idx in tree_path[1:]:
+            board += self.__positions[piece_idx][position_idx]
+        return board
+
+    def __children(self, tree_path, mask):
+        """Generate the valid child tree paths of a tree path, in the crawl
+        order of the engine
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - tree path
+            mask: integer - board bitmask of the tree path
+        Return: generator of tuples (tree path, mask) - child tree paths
+            and their board bitmasks
+        """
+
+        if self.__engine == "cell":
+            index = self.__table[0]
+            used = index.used(tree_path)
+            types = index.types
+            cell = ((mask + 1) & ~mask).bit_length() - 1
+            for type_idx, position_idx, position in index[cell]:
+                type_used = used[type_idx]
+                if type_used < len(types[type_idx]) and not mask & position:
+                    child = (types[type_idx][type_used], position_idx)
+                    yield tree_path + [child], mask | position
+        else:
+            piece_idx = tree_path[-1][0] + 1
+            masks = self.__positions[piece_idx].masks
+            # Copies of a piece are combined in increasing positions order
+            start = 0
+            if self.__positions.copies[piece_idx]:
+                start = tree_path[-1][1] + 1
+            for position_idx, position in enumerate(masks[start:], start):
+                if not mask & position:
+                    child = (piece_idx, position_idx)
+                    yield tree_path + [child], mask | position
+
+    def __crawled(self, tree_path, mask):
+        """Child tree paths of a tree path which are crawled by the engine:
+        the valid ones, without the ones leaving a dead region or, for the
+        bitset engine, leaving a remaining piece without valid position
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - tree path
+            mask: integer - board bitmask of the tree path
+        Return: list of tuples (tree path, mask) - crawled child tree paths
+            and their board bitmasks
+        """
+
+        children = list(self.__children(tree_path, mask))
+        if len(tree_path) > self.__max_depth:
+            return children
+        if self.__engine == "bitset":
+            return [
+                (child, child_mask) for child, child_mask in children
+                if all(self.__table.candidates(child))
+            ]
+        if self.__regions is None:
+            return children
+        crawled = []
+        for child, child_mask in children:
+            placed = {piece_idx for piece_idx, position_idx in child}
+            remaining = [
+                piece_idx for piece_idx in range(len(self.__positions))
+                if piece_idx not in placed
+            ]
+            if not self.__regions.dead(child_mask, remaining):
+                crawled.append((child, child_mask))
+        return crawled
+
+    def estimate(self, generator, duration=ESTIMATE_TIME):
+        """Estimate the # of tree nodes to crawl, with the Knuth's method:
+        a probe goes down the tree from a random root, in the crawl order of
+        the engine, through random crawled children. The product of the #
+        of crawled children met at each level, summed over the levels, is an
+        unbiased estimate of the # of nodes. The probes estimates are
+        heavy-tailed: the more probes, the better.
+
+        Inputs:
+            generator: random.Random - random numbers generator
+            duration: float, optional, ESTIMATE_TIME - # of seconds of
+                probes, at least 2 probes are done
+        Return: tuple (float, float, float, integer) - mean of the probes
+            estimates, bounds of its 95% confidence interval and # of probes
+        """
+
+        roots = self.roots()
+        if not roots:
+            return 0.0, 0.0, 0.0, 0
+        estimates = []
+        deadline = monotonic() + duration
+        while len(estimates) < 2 or monotonic() < deadline:
+            tree_path = generator.choice(roots)
+            mask = self.__mask(tree_path)
+            weight = len(roots)
+            nodes = weight
+            # Nodes are crawled down to the max depth, their children at
+            # the last level are the solutions
+            while len(tree_path) <= self.__max_depth:
+                children = self.__crawled(tree_path, mask)
+                if not children:
+                    break
+                weight *= len(children)
+                nodes += weight
+                tree_path, mask = generator.choice(children)
+            estimates.append(nodes)
+        mean = fmean(estimates)
+        margin = 1.96 * stdev(estimates) / len(estimates) ** 0.5
+        return mean, max(mean - margin, 0.0), mean + margin, len(estimates)
+
+    def calibrate(self, generator, duration=CALIBRATION_TIME):
+        """Measure the # of tree nodes crawled per second by a crawler of
+        the engine, crawling random tree roots in the main process for a
+        short time
+
+        Inputs:
+            generator: random.Random - random numbers generator
+            duration: float, optional, CALIBRATION_TIME - max # of seconds
+                of crawling
+        Return: float - # of nodes crawled per second, 0.0 if none
+        """
+
+        global crawled_nodes, stopping
+
+        def timeout():
+            global stopping
+            stopping = True
+
+        crawl = crawl_engines[self.__engine]
+        roots = self.roots()
+        generator.shuffle(roots)
+        # The solutions are dropped
+        queue = SolutionsSink()
+        timer = td.Timer(duration, timeout)
+        crawled_nodes = 0
+        start = monotonic()
+        timer.start()
+        for tree_path in roots:
+            if stopping:
+                break
+            crawl(
+                self.__table,
                 tree_path,
-                board,
+                self.board(tree_path),
                 self.__max_depth,
-                self.__queue,
-                self.__first,
-                self.__found
+                queue,
+                False,
+                td.Event()
             )
-        )
-        self.__crawlers.append(crawler)
+        elapsed = monotonic() - start
+        timer.cancel()
+        stopping = False
+        return crawled_nodes / elapsed if elapsed else 0.0
+
+    def split(self, jobs=None):
+        """Split the tree roots in subtrees roots, level by level, down to
+        the split depth or until there are enough tasks for the crawlers.
+        Subtrees always keep at least one level to crawl.
+
+        Inputs:
+            jobs: integer, optional, None - # of processes crawling the
+                tasks, the # of crawler processes of the pool if None
+        Return: list of list of integer tuples (piece, position) - subtrees
+            roots
+        """
+
+        jobs = jobs or self.__jobs
+
+        subtrees = [(tree_path, self.__mask(tree_path))
+                    for tree_path in self.__roots]
+        depth = 0
+        while subtrees:
+            if self.__split_depth is None:
+                if len(subtrees) >= jobs * TASKS_PER_CRAWLER:
+                    break
+            elif depth == self.__split_depth:
+                break
+            # Don't split subtrees at the last level to crawl
+            if any(len(tree_path) > self.__max_depth
+                   for tree_path, mask in subtrees):
+                break
+            subtrees = [
+                child
+                for tree_path, mask in subtrees
+                for child in self.__children(tree_path, mask)
+            ]
+            depth += 1
+        return [tree_path for tree_path, mask in subtrees]
+
+    def roots(self):
+        """Tree roots of the engine: the root positions of the first piece,
+        or for the cell engine the positions of each piece type covering the
+        first cell of the board
+
+        Return: list of list of integer tuples (piece, position) - tree
+            roots
+        """
+
+        if self.__engine == "cell":
+            index = self.__table[0]
+            return [
+                [(index.types[type_idx][0], position_idx)]
+                for type_idx, position_idx, mask in index[0]
+            ]
+        return [
+            [(0, position_idx)]
+            for position_idx in self.__positions.roots
+        ]
+
+    def add(self, tree_path):
+        """Add a tree root to the crawlers tasks
+
+        Inputs:
+            tree_path: list of integer tuples (row, col) - tree root
+        """
+
+        self.__roots.append(tree_path)
 
-    def start(self):
-        """Start all the crawlers and the supervisor thread"""
+    def start(self, tasks=None):
+        """Split the trees, queue the subtrees for the crawlers and start the
+        crawlers pool
 
-        # Create the supervisor
-        self.__supervisor = td.Thread(target=self.__supervise, daemon=True)
+        Inputs:
+            tasks: list of list of integer tuples (piece, position),
+                optional, None - subtrees roots to queue instead of the split
+                trees (resumed solve)
+        """
+
+        # Queue the subtrees with their task index and board
+        if tasks is None:
+            tasks = self.split()
+        for task_idx, tree_path in enumerate(tasks):
+            self.__tasks.put((task_idx, tree_path, self.board(tree_path)))
+            self.__pending[task_idx] = tree_path
+        self.__tasks_count = len(self.__pending)
+
+        # No need for more crawlers than tasks
+        jobs = min(self.__jobs, self.__tasks_count)
+        # Counters slots of the crawlers
+        self.__counters = RawArray("Q", jobs * len(COUNTERS))
+        # The numpy engines positions are published once in shared memory,
+        # instead of pickling them for each crawler
+        table = self.__table
+        if self.__engine in ("numpy", "iterative") and jobs:
+            self.__shared = self.__positions.shared()
+            table = self.__shared
+        # CPUs to pin the crawlers to
+        cpus = [None]
+        if self.__pin and hasattr(os, "sched_getaffinity"):
+            cpus = sorted(os.sched_getaffinity(0))
+        # Create the crawlers, each of them ends on a 'None' task
+        for crawler_idx in range(jobs):
+            self.__tasks.put(None)
+            crawler = Process(
+                target=crawler_worker,
+                args=(
+                    self.__engine,
+                    table,
+                    self.__tasks,
+                    self.__max_depth,
+                    self.__queue,
+                    self.__first,
+                    self.__found,
+                    cpus[crawler_idx % len(cpus)],
+                    self.__regions,
+                    self.__counters,
+                    crawler_idx,
+                    self.__batch_size,
+                    self.__flush_interval,
+                    self.__classes
+                ),
+                daemon=True
+            )
+            self.__crawlers.append(crawler)
         # Start the crawlers
         for crawler in self.__crawlers:
-            crawler.deamon = True
             crawler.start()
-        # Start the supervisor
-        self.__supervisor.start()
 
-    def get_solutions(self, solutions):
+    def get_solutions(self, solutions, checkpoint=None, progress=None):
         """Get solutions from the queue, add them to solutions
-        collection, until there is no more active crawler
+        collection, until there is no more active crawler. The crawlers send
+        their solutions by batches of records (or by tallies, when only
+        counting the solutions), the index of each task they
+        finish after its solutions, and a 'None' message when they end: the
+        queue is read with blocking gets, so the main process sleeps while
+        the crawlers run.
+        The crawlers are stopped when the solve budget (timeout, max # of
+        nodes or of solutions) is reached, or on a first keyboard interrupt:
+        they send the solutions already found and end, the solutions
+        collected are partial. A second keyboard interrupt terminates them.
 
+        Inputs:
+            checkpoint: Checkpoint, optional, None - checkpoint to save
+                periodically and at the end with the tasks not finished and
+                the solutions
+            progress: Progress, optional, None - progress to report
+                periodically and at the end with the tasks finished and the
+                crawlers counters
         Outputs:
             solutions: SolutionsCollection, puzzle collection of solutions
+        Exceptions:
+            TalosFileSystemError: error in saving the checkpoint or the
+                progress
         """
 
-        # Loop while we have some crawlers running
-        while not self.__done.is_set():
-            solution_tree_path = None
+        deadline = None
+        if self.__timeout is not None:
+            deadline = monotonic() + self.__timeout
+        interrupted = False
+        try:
+            # Loop while we have some crawlers running
+            running = len(self.__crawlers)
+            while running:
+                try:
+                    self.__budget(solutions, deadline)
+                    if checkpoint and checkpoint.due():
+                        self.__save(checkpoint, solutions)
+                    if progress and progress.due():
+                        self.__report(progress)
+                    timeout = COLLECTOR_TIMEOUT
+                    if deadline is not None and not self.__halted:
+                        timeout = max(
+                            min(timeout, deadline - monotonic()), 0.0
+                        )
+                    try:
+                        message = self.__queue.get(timeout=timeout)
+                    except Empty:
+                        # A crawler killed before sending its 'None' message
+                        # can't be waited for
+                        if not any(
+                            crawler.is_alive() for crawler in self.__crawlers
+                        ):
+                            break
+                        continue
+                    if message is None:
+                        running -= 1
+                    elif isinstance(message, int):
+                        del self.__pending[message]
+                    elif isinstance(message, tuple):
+                        solutions.add_tally(message)
+                    else:
+                        width = self.__max_depth + 2
+                        for tree_path in unpack(message, width):
+                            if (
+                                self.__max_solutions is not None
+                                and len(solutions) >= self.__max_solutions
+                            ):
+                                break
+                            solutions.add(tree_path)
+                except KeyboardInterrupt:
+                    # First interrupt stops the crawlers gracefully, the second
+                    # one terminates them
+                    if not interrupted:
+                        interrupted = True
+                        self.__halted = "interrupt"
+                        self.__found.set()
+                    else:
+                        for crawler in self.__crawlers:
+                            crawler.terminate()
+                        break
+            # Wait for crawlers ending, terminate them on keyboard interrupt
             try:
-                # Try to get a solution from the queue
-                solution_tree_path = self.__queue.get_nowait()
-            except Empty:
-                pass
-            if solution_tree_path:
-                # Add it to the collection if we have one
-                solutions.add(solution_tree_path)
-        # Wait for supervisor ending
-        self.__supervisor.join()
+                for crawler in self.__crawlers:
+                    crawler.join()
+            except KeyboardInterrupt:
+                self.__halted = "interrupt"
+                for crawler in self.__crawlers:
+                    crawler.terminate()
+                    crawler.join()
+            if checkpoint:
+                self.__save(checkpoint, solutions)
+            if progress:
+                self.__report(progress)
+        finally:
+            # On an error in saving the checkpoint or the progress, the
+            # crawlers still running are terminated
+            for crawler in self.__crawlers:
+                if crawler.is_alive():
+                    crawler.terminate()
+                    crawler.join()
+            if self.__shared:
+                self.__shared.release()
+                self.__shared = None
+
+
+def usable_cpu_count():
+    """Count the CPUs usable by the application: the CPUs it is allowed to
+    run on, limited by the CPU quota of its cgroup (containers)
+
+    Return: integer - # of usable CPUs
+    """
+
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # cgroup v2 quota ("max" or "<quota> <period>") and cgroup v1 quota
+    # (-1 if none)
+    quotas = [
+        ("/sys/fs/cgroup/cpu.max", None),
+        (
+            "/sys/fs/cgroup/cpu/cpu.cfs_quota_us",
+            "/sys/fs/cgroup/cpu/cpu.cfs_period_us"
+        )
+    ]
+    for quota_file, period_file in quotas:
+        try:
+            with open(quota_file) as f:
+                values = f.read().split()
+            if period_file:
+                with open(period_file) as f:
+                    values.append(f.read().strip())
+            if values[0] not in ("max", "-1"):
+                cpus = min(cpus, ceil(int(values[0]) / int(values[1])))
+            break
+        except (OSError, ValueError, IndexError):
+            pass
+    return max(cpus, 1)
+
+
+def crawler_worker(engine, table, tasks, max_depth, queue, first, found,
+                   cpu=None, regions=None, counters=None, crawler_idx=0,
+                   batch_size=1, flush_interval=0.0, classes=None):
+    """Crawl the trees from the tasks queue, until a 'None' task, then send
+    a 'None' message to tell the end of work. The solutions are sent by
+    batches of records (see SolutionsBatch), and the index of each finished
+    task after its solutions. A thread publishes the crawler counters
+    (COUNTERS) in its slot, every PUBLISH_INTERVAL seconds and at the end,
+    and waits for the stop event: the tree crawlers only test the stopping
+    flag set by the thread, not the shared event. The keyboard interrupts
+    are left to the main process. Designed to be ran in a separate process.
+
+    Inputs:
+        engine: string - name of the crawler engine (see crawl_engines)
+        table: SharedPositions, tuple (masks, copies, regions), tuple
+            (CellsIndex, regions) or PositionsCompatibility - positions table
+            of the engine
+        tasks: multiprocessing.Queue - tree roots to crawl, as (task index,
+            tree path, board) tuples
+        max_depth: integer - max depth for tree crawling
+        queue: multiprocessing.Queue - communication queue for crawlers
+        first: boolean - stop at first solution found
+        found: multiprocessing.Event - stop event for crawlers, set on the
+            first solution found or by the main process
+        cpu: integer, optional, None - CPU to pin the process to
+        regions: DeadRegions, optional, None - dead regions pruning of the
+            table
+        counters: multiprocessing.RawArray, optional, None - counters
+            (COUNTERS) of the crawlers
+        crawler_idx: integer, optional, 0 - slot of the crawler in the
+            counters
+        batch_size: integer, optional, 1 - # of solutions of a full batch
+        flush_interval: float, optional, 0.0 - max # of seconds a solution
+            waits in the batch
+        classes: SolutionsClasses, optional, None - classes of equal
+            solutions, to send tallies of the solutions (see SolutionsTally)
+            instead of the solutions
+    Outputs:
+        queue: multiprocessing.Queue - communication queue for crawlers
+        found: multiprocessing.Event - solution found event for crawlers
+        counters: multiprocessing.RawArray - counters of the crawlers
+    """
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if cpu is not None:
+        os.sched_setaffinity(0, {cpu})
+    crawl = crawl_engines[engine]
+    if classes is None:
+        batch = SolutionsBatch(queue, batch_size, flush_interval)
+    else:
+        batch = SolutionsTally(queue, classes)
+    done = td.Event()
+
+    def publish():
+        """Publish the crawler counters in its slot"""
+
+        if counters is not None:
+            slot = crawler_idx * len(COUNTERS)
+            counters[slot] = crawled_nodes
+            counters[slot + 1] = regions.cut if regions else 0
+            counters[slot + 2] = batch.solutions
+
+    def publisher():
+        """Publish the crawler counters until the end of work, stop the tree
+        crawlers as soon as the stop event is set
+        """
+
+        global stopping
+        while not done.is_set():
+            if stopping:
+                done.wait(PUBLISH_INTERVAL)
+            elif found.wait(PUBLISH_INTERVAL):
+                stopping = True
+            publish()
+
+    td.Thread(target=publisher, daemon=True).start()
+    try:
+        for task in iter(tasks.get, None):
+            # Skip the remaining tasks if we have to stop
+            if stopping:
+                continue
+            task_idx, tree_path, board = task
+            crawl(table, tree_path, board, max_depth, batch, first, found)
+            # A task is finished once all its solutions are sent. It's not if
+            # the crawl stopped
+            batch.flush()
+            if not stopping:
+                queue.put(task_idx)
+    finally:
+        # End of work, after the solutions sent and the counters published
+        done.set()
+        publish()
+        batch.flush()
+        queue.put(None)
 
 
 def crawl_tree(positions, tree_path, board, max_depth, queue, first, found):
@@ -140,7 +929,8 @@ def crawl_tree(positions, tree_path, board, max_depth, queue, first, found):
     determine puzzle solutions. Designed to be ran in a separate process.
 
     Inputs:
-        positions: PositionsStackCollection - puzzle collection of positions
+        positions: PositionsStackCollection or SharedPositions - puzzle
+            collection of positions
         tree_path: list of integer tuples (row, col) - valid tree path
         board: numpy array - puzzle board
         max_depth: integer - max depth for tree crawling
@@ -153,24 +943,102 @@ def crawl_tree(positions, tree_path, board, max_depth, queue, first, found):
         found: multiprocessing.Event - solution found event for crawlers
     """
 
+    global crawled_nodes, stopping
+    # Count the node for the progress reports
+    crawled_nodes += 1
     current_node = tree_path[-1]
     next_piece_idx = current_node[0] + 1
+    # If next piece is a copy of current one, its positions are combined
+    # only after current position, to combine each set of positions once
+    start = 0
+    if positions.copies[next_piece_idx]:
+        start = current_node[1] + 1
+    # Test all the positions of next piece against the board at once: the
+    # product of the positions matrix by the flattened board counts the
+    # cells each position shares with the board
+    overlaps = positions.matrix(next_piece_idx)[start:].dot(board.ravel())
+    stack = positions[next_piece_idx]
+    # Combine current node with the valid nodes (positions) of next piece
+    for position_idx in (numpy.flatnonzero(overlaps == 0) + start).tolist():
+        # Exits immediately, if the crawler has to stop (first solution
+        # found or solve budget reached)
+        if stopping:
+            break
+        # We have a valid combination with next node (no overlap of
+        # pieces). Add next node to tree path
+        tree_path.append((next_piece_idx, position_idx))
+        if current_node[0] == max_depth:
+            # We have reach the end of the tree branch, then we have a
+            # solution. Send copy of valid tree path to main process.
+            queue.put(tree_path.copy())
+            # If we have to stop after first solution found, tell other
+            # processes that a solution has been found
+            if first:
+                found.set()
+                stopping = True
+        else:
+            # Move to the next piece with the position placed on the board,
+            # then remove it
+            position = stack[position_idx]
+            board += position
+            crawl_tree(
+                positions,
+                tree_path,
+                board,
+                max_depth,
+                queue,
+                first,
+                found
+            )
+            board -= position
+        # Restore tree path to current node
+        tree_path.pop()
+
+
+def crawl_tree_bitboard(table, tree_path, board, max_depth, queue, first,
+                        found):
+    """Recursively go through the positions tree and combine them to
+    determine puzzle solutions, with the board and the positions as integer
+    bitmasks. Designed to be ran in a separate process.
+
+    Inputs:
+        table: tuple (masks, copies, regions) - positions bitmasks per piece
+            (list of list of integers), copies of pieces (list of booleans)
+            and dead regions pruning (DeadRegions, None if none)
+        tree_path: list of integer tuples (row, col) - valid tree path
+        board: integer - puzzle board bitmask
+        max_depth: integer - max depth for tree crawling
+        queue: multiprocessing.Queue - communication queue for crawlers
+        first: boolean - stop at first solution found
+        found: multiprocessing.Event - solution found event for crawlers
+    Outputs:
+        tree_path: list of integer tuples (row, col) - valid tree path
+        queue: multiprocessing.Queue - communication queue for crawlers
+        found: multiprocessing.Event - solution found event for crawlers
+    """
+
+    global crawled_nodes, stopping
+    # Count the node for the progress reports
+    crawled_nodes += 1
+    masks, copies, regions = table
+    current_node = tree_path[-1]
+    next_piece_idx = current_node[0] + 1
+    # If next piece is a copy of current one, its positions are combined
+    # only after current position, to combine each set of positions once
+    start = 0
+    if copies[next_piece_idx]:
+        start = current_node[1] + 1
     # Combine current node with all nodes (positions) of next piece
-    for position_idx, position in enumerate(positions[next_piece_idx]):
-        # Exits immediately, if we have to stop after first solution found
-        if first:
-            if found.is_set():
-                break
-        # Next node
-        next_node = (next_piece_idx, position_idx)
-        # Save current board
-        backup_board = numpy.copy(board)
-        # Combine the positions on the board and test it
-        board += position
-        if numpy.max(board) <= 1:
+    for position_idx, mask in enumerate(masks[next_piece_idx][start:], start):
+        # Exits immediately, if the crawler has to stop (first solution
+        # found or solve budget reached)
+        if stopping:
+            break
+        # A position overlaps the board if they share at least one cell
+        if not board & mask:
             # We have a valid combination with next node (no overlap of
             # pieces). Add next node to tree path
-            tree_path.append(next_node)
+            tree_path.append((next_piece_idx, position_idx))
             if current_node[0] == max_depth:
                 # We have reach the end of the tree branch, then we have a
                 # solution. Send copy of valid tree path to main process.
@@ -179,12 +1047,17 @@ def crawl_tree(positions, tree_path, board, max_depth, queue, first, found):
                 # processes that a solution has been found
                 if first:
                     found.set()
-            else:
-                # Move to the next piece
-                crawl_tree(
-                    positions,
+                    stopping = True
+            elif regions is None or not regions.dead(
+                board | mask,
+                range(next_piece_idx + 1, len(masks))
+            ):
+                # Move to the next piece with the position placed on the
+                # board, if it leaves no dead region
+                crawl_tree_bitboard(
+                    table,
                     tree_path,
-                    board,
+                    board | mask,
                     max_depth,
                     queue,
                     first,
@@ -192,5 +1065,361 @@ def crawl_tree(positions, tree_path, board, max_depth, queue, first, found):
                 )
             # Restore tree path to current node
             tree_path.pop()
-        # Restore board to previous state and move to next position
-        board = numpy.copy(backup_board)
+
+
+def crawl_tree_cell(table, tree_path, board, max_depth, queue, first, found,
+                    used=None):
+    """Recursively fill the first empty cell of the board with the positions
+    of the remaining pieces, to determine puzzle solutions. Designed to be
+    ran in a separate process.
+
+    Inputs:
+        table: tuple (CellsIndex, regions) - positions of each piece type by
+            anchor cell and dead regions pruning (DeadRegions, None if none)
+        tree_path: list of integer tuples (row, col) - valid tree path
+        board: integer - puzzle board bitmask
+        max_depth: integer - max depth for tree crawling
+        queue: multiprocessing.Queue - communication queue for crawlers
+        first: boolean - stop at first solution found
+        found: multiprocessing.Event - solution found event for crawlers
+        used: list of integers, optional, None - # of used pieces of each
+            type, counted from the tree path if None
+    Outputs:
+        tree_path: list of integer tuples (row, col) - valid tree path
+        queue: multiprocessing.Queue - communication queue for crawlers
+        found: multiprocessing.Event - solution found event for crawlers
+    """
+
+    global crawled_nodes, stopping
+    # Count the node for the progress reports
+    crawled_nodes += 1
+    index, regions = table
+    if used is None:
+        used = index.used(tree_path)
+    types = index.types
+    last = len(tree_path) == max_depth + 1
+    # First empty cell of the board (lowest unset bit)
+    cell = ((board + 1) & ~board).bit_length() - 1
+    # Combine current node with the positions anchored on the empty cell
+    for type_idx, position_idx, mask in index[cell]:
+        # Exits immediately, if the crawler has to stop (first solution
+        # found or solve budget reached)
+        if stopping:
+            break
+        # Skip the position if no piece of its type remains or if it
+        # overlaps the board
+        type_used = used[type_idx]
+        if type_used == len(types[type_idx]) or board & mask:
+            continue
+        # We have a valid combination with next node, with the next piece of
+        # the type. Add next node to tree path
+        tree_path.append((types[type_idx][type_used], position_idx))
+        if last:
+            # We have reach the end of the tree branch, then we have a
+            # solution. Send copy of valid tree path to main process.
+            queue.put(tree_path.copy())
+            # If we have to stop after first solution found, tell other
+            # processes that a solution has been found
+            if first:
+                found.set()
+                stopping = True
+        else:
+            # Move to the next empty cell, if the position leaves no dead
+            # region
+            used[type_idx] += 1
+            if regions is None or not regions.dead(
+                board | mask,
+                [
+                    stacks[0] for stacks, type_used in zip(types, used)
+                    if type_used < len(stacks)
+                ]
+            ):
+                crawl_tree_cell(
+                    table,
+                    tree_path,
+                    board | mask,
+                    max_depth,
+                    queue,
+                    first,
+                    found,
+                    used
+                )
+            used[type_idx] -= 1
+        # Restore tree path to current node
+        tree_path.pop()
+
+
+def crawl_tree_bitset(compatibility, tree_path, candidates, max_depth, queue,
+                      first, found):
+    """Recursively go through the positions tree and combine them to
+    determine puzzle solutions. Instead of a board, keep the bitsets of the
+    valid positions of the remaining pieces, as the intersection of the
+    compatible positions bitsets of the tree path nodes. Designed to be ran
+    in a separate process.
+
+    Inputs:
+        compatibility: PositionsCompatibility - compatible positions of each
+            pair of pieces
+        tree_path: list of integer tuples (row, col) - valid tree path
+        candidates: list of integers - valid positions bitset of each piece
+            after the tree path
+        max_depth: integer - max depth for tree crawling
+        queue: multiprocessing.Queue - communication queue for crawlers
+        first: boolean - stop at first solution found
+        found: multiprocessing.Event - solution found event for crawlers
+    Outputs:
+        tree_path: list of integer tuples (row, col) - valid tree path
+        queue: multiprocessing.Queue - communication queue for crawlers
+        found: multiprocessing.Event - solution found event for crawlers
+    """
+
+    global crawled_nodes, stopping
+    # Count the node for the progress reports
+    crawled_nodes += 1
+    current_node = tree_path[-1]
+    next_piece_idx = current_node[0] + 1
+    bitsets = compatibility[next_piece_idx]
+    remaining = candidates[1:]
+    # Combine current node with the valid nodes (positions) of next piece
+    positions = candidates[0]
+    while positions:
+        # Exits immediately, if the crawler has to stop (first solution
+        # found or solve budget reached)
+        if stopping:
+            break
+        # Next valid position (lowest bit of the bitset)
+        position = positions & -positions
+        positions ^= position
+        position_idx = position.bit_length() - 1
+        # Add next node to tree path
+        tree_path.append((next_piece_idx, position_idx))
+        if current_node[0] == max_depth:
+            # We have reach the end of the tree branch, then we have a
+            # solution. Send copy of valid tree path to main process.
+            queue.put(tree_path.copy())
+            # If we have to stop after first solution found, tell other
+            # processes that a solution has been found
+            if first:
+                found.set()
+                stopping = True
+        else:
+            # Restrict the valid positions of the remaining pieces and move
+            # to the next piece if each of them has at least one
+            next_candidates = [
+                candidate & bitset
+                for candidate, bitset in zip(
+                    remaining,
+                    bitsets[position_idx]
+                )
+            ]
+            if all(next_candidates):
+                crawl_tree_bitset(
+                    compatibility,
+                    tree_path,
+                    next_candidates,
+                    max_depth,
+                    queue,
+                    first,
+                    found
+                )
+        # Restore tree path to current node
+        tree_path.pop()
+
+
+def crawl_tree_iterative(positions, tree_path, board, max_depth, queue, first,
+                         found):
+    """Go through the positions tree and combine them to determine puzzle
+    solutions, as crawl_tree but iteratively, with an explicit stack
+    allocated once per positions collection (reused by the tasks of the
+    crawler process) and the positions added to and removed from the board
+    in place (no board copy). Designed to be ran in a separate process.
+
+    Inputs:
+        positions: PositionsStackCollection or SharedPositions - puzzle
+            collection of positions
+        tree_path: list of integer tuples (row, col) - valid tree path
+        board: numpy array - puzzle board
+        max_depth: integer - max depth for tree crawling
+        queue: multiprocessing.Queue - communication queue for crawlers
+        first: boolean - stop at first solution found
+        found: multiprocessing.Event - solution found event for crawlers
+    Outputs:
+        tree_path: list of integer tuples (row, col) - valid tree path
+        queue: multiprocessing.Queue - communication queue for crawlers
+        found: multiprocessing.Event - solution found event for crawlers
+    """
+
+    global crawled_nodes, stopping, iterative_stack
+    copies = positions.copies
+    # Positions and tree nodes of each piece, next position to combine at
+    # each level of the explicit stack and maximum of the board, allocated
+    # by the first task of the positions collection
+    if iterative_stack is None or iterative_stack[0] is not positions:
+        stacks = [list(positions[level]) for level in range(len(positions))]
+        iterative_stack = (
+            positions,
+            stacks,
+            [
+                [(level, position_idx) for position_idx in range(len(stack))]
+                for level, stack in enumerate(stacks)
+            ],
+            [0 for stack in stacks],
+            numpy.zeros((), board.dtype)
+        )
+    _, stacks, nodes, next_positions, board_max = iterative_stack
+    root_level = len(tree_path)
+    last_level = max_depth + 1
+    level = root_level
+    # If next piece is a copy of current one, its positions are combined
+    # only after current position, to combine each set of positions once
+    next_positions[level] = 0
+    if copies[level]:
+        next_positions[level] = tree_path[-1][1] + 1
+    # Count the nodes for the progress reports
+    crawled_nodes += 1
+    while True:
+        # Exits immediately, if the crawler has to stop (first solution
+        # found or solve budget reached)
+        if stopping:
+            break
+        stack = stacks[level]
+        position_idx = next_positions[level]
+        if position_idx == len(stack):
+            # All the positions of the piece are combined, back to the
+            # previous piece and remove its position from the board
+            if level == root_level:
+                break
+            level -= 1
+            node = tree_path.pop()
+            numpy.subtract(board, stacks[level][node[1]], out=board)
+            continue
+        next_positions[level] = position_idx + 1
+        # Combine the position on the board and test it
+        position = stack[position_idx]
+        numpy.add(board, position, out=board)
+        numpy.max(board, out=board_max)
+        if board_max <= 1:
+            # We have a valid combination with next node (no overlap of
+            # pieces). Add next node to tree path
+            tree_path.append(nodes[level][position_idx])
+            if level == last_level:
+                # We have reach the end of the tree branch, then we have a
+                # solution. Send copy of valid tree path to main process.
+                queue.put(tree_path.copy())
+                # If we have to stop after first solution found, tell other
+                # processes that a solution has been found
+                if first:
+                    found.set()
+                    stopping = True
+                tree_path.pop()
+            else:
+                # Move to the next piece, keeping the position on the board
+                level += 1
+                crawled_nodes += 1
+                next_positions[level] = 0
+                if copies[level]:
+                    next_positions[level] = position_idx + 1
+                continue
+        # Remove the position from the board and move to next position
+        numpy.subtract(board, position, out=board)
+
+
+def crawl_tree_frontier(table, tree_path, board, max_depth, queue, first,
+                        found):
+    """Go through the positions tree level by level (breadth first): the
+    partial boards of a level (the frontier) are a numpy array of bitmasks,
+    tested against all the positions of the next piece at once. When the
+    next level would exceed the memory budget, crawl the subtree of each
+    node of the frontier depth first, with the bitboard crawler. Designed to
+    be ran in a separate process.
+
+    Inputs:
+        table: tuple (arrays, masks, copies, regions, budget) - positions
+            bitmasks per piece as numpy arrays (list of numpy.uint64
+            arrays) and as integers (list of list of integers), copies of
+            pieces (list of booleans), dead regions pruning of the depth
+            first levels (DeadRegions, None if none) and memory budget in
+            bytes of the breadth first levels (None for depth first only)
+        tree_path: list of integer tuples (row, col) - valid tree path
+        board: integer - puzzle board bitmask
+        max_depth: integer - max depth for tree crawling
+        queue: multiprocessing.Queue - communication queue for crawlers
+        first: boolean - stop at first solution found
+        found: multiprocessing.Event - solution found event for crawlers
+    Outputs:
+        queue: multiprocessing.Queue - communication queue for crawlers
+        found: multiprocessing.Event - solution found event for crawlers
+    """
+
+    global crawled_nodes, stopping
+    arrays, masks, copies, regions, budget = table
+    # Frontier: board bitmask and positions indexes of each node
+    boards = numpy.array([board], dtype=numpy.uint64)
+    nodes = numpy.array(
+        [[position_idx for piece_idx, position_idx in tree_path]],
+        dtype=numpy.int32
+    )
+    piece_idx = tree_path[-1][0]
+    while budget is not None and piece_idx <= max_depth:
+        # Exits immediately, if the crawler has to stop (first solution
+        # found or solve budget reached)
+        if stopping or not len(boards):
+            return
+        positions = arrays[piece_idx + 1]
+        if len(boards) * len(positions) * FRONTIER_PAIR_BYTES > budget:
+            break
+        # Test all the positions of next piece against all the boards: a
+        # position overlaps a board if they share at least one cell
+        valid = (boards[:, None] & positions[None, :]) == 0
+        # If next piece is a copy of current one, its positions are
+        # combined only after current position
+        if copies[piece_idx + 1]:
+            valid &= (
+                numpy.arange(len(positions))[None, :] > nodes[:, -1:]
+            )
+        count = int(numpy.count_nonzero(valid))
+        if count * (FRONTIER_NODE_BYTES + 4 * nodes.shape[1]) > budget:
+            break
+        # Count the nodes of the level for the progress reports
+        crawled_nodes += len(boards)
+        node_idx, position_idx = numpy.nonzero(valid)
+        boards = boards[node_idx] | positions[position_idx]
+        nodes = numpy.column_stack((nodes[node_idx], position_idx))
+        piece_idx += 1
+    if piece_idx > max_depth:
+        # The frontier is the last level, its nodes are solutions. Send
+        # them to main process.
+        for node in nodes.tolist():
+            queue.put(list(enumerate(node)))
+            # If we have to stop after first solution found, tell other
+            # processes that a solution has been found
+            if first:
+                found.set()
+                stopping = True
+                break
+        return
+    # Crawl the subtree of each node of the frontier depth first
+    bitboard = (masks, copies, regions)
+    for node, node_board in zip(nodes.tolist(), boards.tolist()):
+        if stopping:
+            break
+        crawl_tree_bitboard(
+            bitboard,
+            list(enumerate(node)),
+            node_board,
+            max_depth,
+            queue,
+            first,
+            found
+        )
+
+
+# Tree crawlers by engine name
+crawl_engines = {
+    "numpy": crawl_tree,
+    "iterative": crawl_tree_iterative,
+    "bitboard": crawl_tree_bitboard,
+    "cell": crawl_tree_cell,
+    "bitset": crawl_tree_bitset,
+    "frontier": crawl_tree_frontier
+}
@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Exact cover solver (Knuth's Algorithm X with Dancing Links)
+
+Name: tpdlx.py
+Comments:
+    The puzzle is an exact cover problem. The columns of the matrix are the
+    board cells, followed by one slot per piece type of the puzzle. The rows
+    of the matrix are the positions of the PositionsStackCollection: each row
+    covers the cells of the position and the slot of its piece type. A
+    solution is a set of rows covering each cell exactly once and each piece
+    type slot as many times as the piece has copies. The copies of a piece
+    share the same rows, so each set of positions is found only once.
+Classes:
+    ExactCover: dancing links matrix of the puzzle and its solver
+Dependencies:
+    None
+"""
+
+
+class ExactCover(object):
+    """Dancing links matrix of the puzzle and Algorithm X solver
+
+    Nodes are integer indexes in the links lists. Node 0 is the root header,
+    nodes 1 to columns count are the column headers and the following nodes
+    are the matrix ones.
+
+    Public members:
+        Methods:
+            solve: generate the solutions of the exact cover problem
+    Private members:
+        Attributes:
+            __left: list of integers - left node of each node
+            __right: list of integers - right node of each node
+            __up: list of integers - up node of each node
+            __down: list of integers - down node of each node
+            __column: list of integers - column header of each node
+            __size: list of integers - # of nodes in each column
+            __node_row: list of integer tuples (type, position) - piece type
+                and position of the row of each node (None for headers)
+            __cells_count: integer - # of cells columns
+            __types: list of list of integers - stacks indexes of each piece
+                type
+        Methods:
+            __add_row: append a row to the matrix
+            __cover: remove a column and its rows from the matrix
+            __uncover: restore a column and its rows in the matrix
+            __search: recursively search the solutions
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, positions, board_rows, board_columns):
+        """Build the dancing links matrix from the positions
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions
+            board_rows: integer - # rows of the puzzle
+            board_columns: integer - # columns of the puzzle
+        """
+
+        cells_count = board_rows * board_columns
+        self.__cells_count = cells_count
+        # Group the copies of a piece in one type
+        self.__types = []
+        for stack_idx, copy in enumerate(positions.copies):
+            if copy:
+                self.__types[-1].append(stack_idx)
+            else:
+                self.__types.append([stack_idx])
+        columns_count = cells_count + len(self.__types)
+        # Root and column headers. Only the cells headers are linked to the
+        # root: the piece types slots are never chosen to branch on, they
+        # are covered once all the copies of the piece are placed
+        headers = range(columns_count + 1)
+        self.__left = [header - 1 for header in headers]
+        self.__left[0] = cells_count
+        self.__right = [header + 1 for header in headers]
+        self.__right[cells_count] = 0
+        for header in headers[cells_count + 1:]:
+            self.__left[header] = header
+            self.__right[header] = header
+        self.__up = list(headers)
+        self.__down = list(headers)
+        self.__column = list(headers)
+        self.__size = [0 for header in headers]
+        self.__node_row = [None for header in headers]
+        # One row per position of each type: its cells and its type slot. The
+        # first stack is restricted to the tree roots positions
+        roots = set(positions.roots)
+        for type_idx, stacks in enumerate(self.__types):
+            for position_idx, mask in enumerate(positions[stacks[0]].masks):
+                if stacks[0] == 0 and position_idx not in roots:
+                    continue
+                columns = [
+                    cell + 1 for cell in range(cells_count)
+                    if mask >> cell & 1
+                ]
+                columns.append(cells_count + 1 + type_idx)
+                self.__add_row((type_idx, position_idx), columns)
+
+    def __add_row(self, tree_node, columns):
+        """Append a row to the matrix
+
+        Inputs:
+            tree_node: integer tuple (type, position) - row piece type and
+                position
+            columns: list of integers - column headers covered by the row
+        """
+
+        first = len(self.__column)
+        for node, column in enumerate(columns, first):
+            # Link the node at the bottom of its column
+            self.__up.append(self.__up[column])
+            self.__down.append(column)
+            self.__down[self.__up[column]] = node
+            self.__up[column] = node
+            self.__column.append(column)
+            self.__size[column] += 1
+            self.__node_row.append(tree_node)
+            # Link the node at the end of the row
+            self.__left.append(node - 1 if node > first else node)
+            self.__right.append(first)
+            self.__right[self.__left[node]] = node
+            self.__left[first] = node
+
+    def __cover(self, column):
+        """Remove the column from the headers and its rows from the other
+        columns
+
+        Inputs:
+            column: integer - the column header
+        """
+
+        left, right = self.__left, self.__right
+        up, down = self.__up, self.__down
+        right[left[column]] = right[column]
+        left[right[column]] = left[column]
+        row = down[column]
+        while row != column:
+            node = right[row]
+            while node != row:
+                down[up[node]] = down[node]
+                up[down[node]] = up[node]
+                self.__size[self.__column[node]] -= 1
+                node = right[node]
+            row = down[row]
+
+    def __uncover(self, column):
+        """Restore the column in the headers and its rows in the other
+        columns, in the reverse order of __cover
+
+        Inputs:
+            column: integer - the column header
+        """
+
+        left, right = self.__left, self.__right
+        up, down = self.__up, self.__down
+        row = up[column]
+        while row != column:
+            node = left[row]
+            while node != row:
+                self.__size[self.__column[node]] += 1
+                down[up[node]] = node
+                up[down[node]] = node
+                node = left[node]
+            row = up[row]
+        right[left[column]] = column
+        left[right[column]] = column
+
+    def __search(self, rows, used):
+        """Recursively search the solutions, branching on the column with the
+        fewest rows
+
+        Inputs:
+            rows: list of integers - a node of each selected row
+            used: list of integers - # of placed pieces of each type
+        Return: generator of lists of integer tuples (piece, position) -
+            solutions tree paths
+        """
+
+        right, left, down = self.__right, self.__left, self.__down
+        size = self.__size
+        if right[0] == 0:
+            # All the cells are covered, we have a solution. The types stacks
+            # follow each other, so the rows sorted by type and position are
+            # the positions of the stacks in order, with the copies of a
+            # piece in increasing positions order
+            yield [
+                (stack_idx, position_idx)
+                for stack_idx, (type_idx, position_idx) in enumerate(
+                    sorted(self.__node_row[row] for row in rows)
+                )
+            ]
+            return
+        # Choose the column with the fewest rows
+        column = right[0]
+        best = column
+        while column != 0:
+            if size[column] < size[best]:
+                best = column
+            column = right[column]
+        self.__cover(best)
+        row = down[best]
+        while row != best:
+            rows.append(row)
+            # The piece type slot is covered with the last copy of the piece
+            type_idx = self.__node_row[row][0]
+            used[type_idx] += 1
+            last_copy = used[type_idx] == len(self.__types[type_idx])
+            node = right[row]
+            while node != row:
+                column = self.__column[node]
+                if column <= self.__cells_count or last_copy:
+                    self.__cover(column)
+                node = right[node]
+            yield from self.__search(rows, used)
+            node = left[row]
+            while node != row:
+                column = self.__column[node]
+                if column <= self.__cells_count or last_copy:
+                    self.__uncover(column)
+                node = left[node]
+            used[type_idx] -= 1
+            rows.pop()
+            row = down[row]
+        self.__uncover(best)
+
+    def solve(self):
+        """Generate the solutions of the exact cover problem. The matrix is
+        restored once the generator is exhausted.
+
+        Return: generator of lists of integer tuples (piece, position) -
+            solutions tree paths, sorted by piece
+        """
+
+        return self.__search([], [0 for stacks in self.__types])
@@ -7,6 +7,7 @@ Exception classes:
     TalosError: base class for tppy exceptions
     TalosArgumentError: errors in command line arguments
     TalosFileSystemError: errors in saving an image or stats
+    TalosNetworkError: errors in the connections of the distributed solve
 """
 
 
@@ -80,3 +81,27 @@ class TalosFileSystemError(TalosError):
 
         super().__init__(message)
         self.syserror = syserror
+
+
+class TalosNetworkError(TalosError):
+    """Network access exceptions
+
+    Inherit:
+        TalosError
+    Public members:
+        Attributes:
+            syserror: Exception - system exception
+    Special methods:
+        __init__: extend TalosError constructor
+    """
+
+    def __init__(self, message, syserror):
+        """Extend TalosError constructor
+
+        Inputs:
+            message: string - explanation of the error
+            syserror: Exception - system exception
+        """
+
+        super().__init__(message)
+        self.syserror = syserror
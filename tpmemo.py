@@ -0,0 +1,285 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Memoized count of the tilings of the board
+
+Name: tpmemo.py
+Comments:
+    The tilings are counted by filling the first empty cell of the board,
+    as the cell engine does, but the # of ways to complete a partial board
+    only depends on its occupancy and on the pieces remaining: many partial
+    boards, reached by different placements, share it. It's memoized in a
+    transposition table keyed by the occupancy bitmask and the remaining
+    pieces counts, packed in one integer. The table is bounded, the least
+    recently used entries being evicted.
+    All the tilings are counted, the symmetrical ones included, and the
+    copies of a piece are not distinguished.
+    The tilings fixed by a board flip are counted the same way, but the
+    piece filling the first empty cell is placed with its symmetrical piece:
+    the partial boards stay symmetrical. The # of tilings up to the board
+    symmetries is then given by the Burnside's lemma: the mean of the #
+    of tilings fixed by each symmetry, the identity included.
+    The memoized counts also draw uniformly random tilings: from the empty
+    board, the piece filling the first empty cell is drawn with a
+    probability proportional to the # of ways to complete the board with
+    it. A draw costs one count of the tilings, then a few table lookups.
+Classes:
+    TilingsCounter: memoized count of the tilings
+Functions:
+    burnside_count: # of tilings up to the board symmetries
+Attributes:
+    MEMO_CAPACITY: const integer - default max # of entries of the table
+    COUNT_BITS: const integer - # of bits of a piece type remaining count
+        in a table key
+Dependencies:
+    collections
+"""
+
+from collections import OrderedDict
+
+MEMO_CAPACITY = 1000000
+COUNT_BITS = 5
+
+
+class TilingsCounter(object):
+    """Memoized count of the tilings of the board, with a bounded least
+    recently used transposition table
+
+    Public members:
+        Methods:
+            count: count the tilings of the board
+            sample: draw a uniformly random tiling of the board
+        Properties:
+            hits: integer - # of counts found in the table
+            misses: integer - # of counts not found in the table
+            evictions: integer - # of entries evicted from the table
+            hit_rate: float - fraction of the counts found in the table
+    Private members:
+        Attributes:
+            __cells: list of list of tuples (shift, mask, pair) - positions
+                of each piece type anchored on each cell: shift of the type
+                count in the remaining pieces key, position bitmask and
+                bitmask of the symmetrical position placed with it (the
+                position itself if not counting symmetrical tilings)
+            __remaining: integer - remaining pieces counts of the empty
+                board, COUNT_BITS bits per piece type
+            __stacks: list of list of integers - stacks of each piece type
+            __indexes: list of dict of integers - position index in the
+                stacks of each piece type, by position bitmask
+            __full: integer - bitmask of the full board
+            __shift: integer - shift of the remaining pieces counts in a
+                table key
+            __capacity: integer - max # of entries of the table
+            __table: collections.OrderedDict of integers - # of tilings by
+                table key, in least recently used order
+            __hits: integer - # of counts found in the table
+            __misses: integer - # of counts not found in the table
+            __evictions: integer - # of entries evicted from the table
+        Methods:
+            __count: count the tilings of a partial board
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, positions, board_rows, board_columns,
+                 capacity=MEMO_CAPACITY, flip=None):
+        """Override object constructor
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions
+            board_rows: integer - # rows of the puzzle
+            board_columns: integer - # columns of the puzzle
+            capacity: integer, optional, MEMO_CAPACITY - max # of entries of
+                the table
+            flip: integer, optional, None - board symmetry (FLIPS index) of
+                the tilings to count, all the tilings if None
+        """
+
+        board_cells = board_rows * board_columns
+        # Group the stacks of the same piece in one type, all the positions
+        # of the first stack of each type (not restricted to the tree roots)
+        # indexed by anchor cell
+        types_pieces = []
+        self.__cells = [[] for cell in range(board_cells)]
+        self.__remaining = 0
+        self.__stacks = []
+        self.__indexes = []
+        for stack_idx in range(len(positions)):
+            stack = positions[stack_idx]
+            if stack.piece not in types_pieces:
+                types_pieces.append(stack.piece)
+                self.__stacks.append([])
+                self.__indexes.append({
+                    mask: position_idx
+                    for position_idx, mask in enumerate(stack.masks)
+                })
+                shift = COUNT_BITS * (len(types_pieces) - 1)
+                for position_idx, mask in enumerate(stack.masks):
+                    pair = mask
+                    if flip is not None:
+                        pair = stack.masks[stack.flips[position_idx][flip]]
+                    anchor = (mask & -mask).bit_length() - 1
+                    self.__cells[anchor].append((shift, mask, pair))
+            type_idx = types_pieces.index(stack.piece)
+            self.__stacks[type_idx].append(stack_idx)
+            self.__remaining += 1 << COUNT_BITS * type_idx
+        self.__full = (1 << board_cells) - 1
+        self.__shift = board_cells
+        self.__capacity = capacity
+        self.__table = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @property
+    def hits(self):
+        """integer - # of counts found in the table"""
+
+        return self.__hits
+
+    @property
+    def misses(self):
+        """integer - # of counts not found in the table"""
+
+        return self.__misses
+
+    @property
+    def evictions(self):
+        """integer - # of entries evicted from the table"""
+
+        return self.__evictions
+
+    @property
+    def hit_rate(self):
+        """float - fraction of the counts found in the table"""
+
+        lookups = self.__hits + self.__misses
+        return self.__hits / lookups if lookups else 0.0
+
+    def __count(self, mask, remaining):
+        """Count the tilings of a partial board, memoized
+
+        Inputs:
+            mask: integer - bitmask of the partial board
+            remaining: integer - remaining pieces counts
+        Return: integer - # of ways to complete the partial board
+        """
+
+        if mask == self.__full:
+            return 1
+        key = mask | remaining << self.__shift
+        table = self.__table
+        count = table.get(key)
+        if count is not None:
+            self.__hits += 1
+            table.move_to_end(key)
+            return count
+        self.__misses += 1
+        # Fill the first empty cell with the remaining pieces
+        cell = ((mask + 1) & ~mask).bit_length() - 1
+        limit = (1 << COUNT_BITS) - 1
+        count = 0
+        for shift, position, pair in self.__cells[cell]:
+            available = remaining >> shift & limit
+            if not available or mask & position:
+                continue
+            if pair == position:
+                count += self.__count(
+                    mask | position,
+                    remaining - (1 << shift)
+                )
+            elif available > 1 and not (mask | position) & pair:
+                # Symmetrical pair of pieces
+                count += self.__count(
+                    mask | position | pair,
+                    remaining - (2 << shift)
+                )
+        table[key] = count
+        if len(table) > self.__capacity:
+            table.popitem(last=False)
+            self.__evictions += 1
+        return count
+
+    def count(self):
+        """Count the tilings of the board
+
+        Return: integer - # of tilings, the symmetrical ones included
+        """
+
+        return self.__count(0, self.__remaining)
+
+    def sample(self, generator):
+        """Draw a uniformly random tiling of the board, among all the
+        tilings (the counter must not be restricted to a board symmetry)
+
+        Inputs:
+            generator: random.Random - random numbers generator
+        Return: list of integer tuples (piece, position) - tree path of the
+            tiling, None if the board has no tiling
+        """
+
+        if not self.count():
+            return None
+        limit = (1 << COUNT_BITS) - 1
+        mask = 0
+        remaining = self.__remaining
+        placed = [0] * len(self.__stacks)
+        tree_path = []
+        while mask != self.__full:
+            # Draw the piece filling the first empty cell, weighted by the
+            # # of ways to complete the board
+            cell = ((mask + 1) & ~mask).bit_length() - 1
+            draws = []
+            for shift, position, pair in self.__cells[cell]:
+                if remaining >> shift & limit and not mask & position:
+                    count = self.__count(
+                        mask | position,
+                        remaining - (1 << shift)
+                    )
+                    if count:
+                        draws.append((count, shift, position))
+            draw = generator.randrange(sum(draw[0] for draw in draws))
+            for count, shift, position in draws:
+                if draw < count:
+                    break
+                draw -= count
+            # Next stack of the piece type
+            type_idx = shift // COUNT_BITS
+            tree_path.append((
+                self.__stacks[type_idx][placed[type_idx]],
+                self.__indexes[type_idx][position]
+            ))
+            placed[type_idx] += 1
+            mask |= position
+            remaining -= 1 << shift
+        return sorted(tree_path)
+
+
+def burnside_count(positions, board_rows, board_columns, tilings,
+                   capacity=MEMO_CAPACITY):
+    """# of tilings up to the board symmetries which keep the shape of each
+    piece (Burnside's lemma)
+
+    Inputs:
+        positions: PositionsStackCollection - puzzle collection of
+            positions
+        board_rows: integer - # rows of the puzzle
+        board_columns: integer - # columns of the puzzle
+        tilings: integer - # of tilings, fixed by the identity
+        capacity: integer, optional, MEMO_CAPACITY - max # of entries of the
+            table of each count
+    Return: tuple (integer, dict of integers) - # of tilings up to the
+        symmetries, and # of tilings fixed by each symmetry (FLIPS index)
+    """
+
+    fixed = {
+        flip: TilingsCounter(
+            positions,
+            board_rows,
+            board_columns,
+            capacity,
+            flip
+        ).count()
+        for flip in positions.symmetries
+    }
+    return (tilings + sum(fixed.values())) // (1 + len(fixed)), fixed
@@ -8,15 +8,22 @@ Classes:
     StrictlyPositive: argparse.Action - check that value is strictly positive
     Positive: argparse.Action - check that value is positive or null
     ValidColorName: argparse.Action - check that value is a HTML color name
+    ValidAddress: argparse.Action - check that value is a host:port address
     TalosArguments: argparse.ArgumentParser - all command line arguments
+    WorkerArguments: argparse.ArgumentParser - worker command line arguments
 Attributes:
     DESCRIPTION_TEXT: const string - description text for help
     EPILOG_TEXT: : const string - epilog text for help
+    WORKER_DESCRIPTION_TEXT: const string - description text for the worker
+        help
 Dependencies:
     argparse
     os
     PIL
+    tpcluster
+    tpcrawler
     tperrors
+    tpmemo
 """
 
 import os
@@ -24,11 +31,16 @@ from argparse import Action, ArgumentParser, RawDescriptionHelpFormatter
 
 from PIL import ImageColor
 
+from tpcluster import AUTHKEY
+from tpcrawler import FRONTIER_MEMORY
+from tpmemo import COUNT_BITS, MEMO_CAPACITY
 from tperrors import TalosArgumentError
 
 
 DESCRIPTION_TEXT = """Try to solve the given puzzle and print status
 or solution if it exists on stdout."""
+WORKER_DESCRIPTION_TEXT = """Connect to a coordinator (tppy.py --serve)
+and crawl the tasks it serves."""
 EPILOG_TEXT = """Puzzle board is made of Rows x Columns cells.
 Column is the horizontal dimension.
 Row is the vertical dimension.
@@ -207,6 +219,43 @@ class Positive(Action):
         setattr(namespace, self.dest, values)
 
 
+class ValidAddress(Action):
+    """Argparse action to check that a value is a host:port address and
+    convert it to a (host, port) tuple
+
+    Inherit:
+        argparse.Actions
+    Special methods:
+        __call__: override argparse.Action __call__
+    Exceptions:
+        TalosArgumentError: value is not a valid host:port address
+    """
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        """Test if value is a valid host:port address, raise error if not
+
+        Inputs:
+            parser: ArgumentParser - object which contains this action.
+            values: string - The associated command-line arguments, with any
+                type conversions applied.
+            option_string: string, optional, None - The option string that was
+                used to invoke this action.
+        Outputs:
+            namespace: Namespace - object that will be returned by parse_args()
+        Exceptions:
+            TalosArgumentError: value is not a valid host:port address
+        """
+
+        host, _, port = values.rpartition(":")
+        if not host or not port.isdigit() or not 0 < int(port) < 65536:
+            raise TalosArgumentError(
+                "{} is not a valid host:port address"
+                .format(values),
+                option_string
+            )
+        setattr(namespace, self.dest, (host, int(port)))
+
+
 class TalosArguments(ArgumentParser):
     """Parse the command line, check and provide the arguments
 
@@ -259,11 +308,186 @@ class TalosArguments(ArgumentParser):
             action="store_true",
             help="Stop at first solution found"
         )
+        super().add_argument(
+            "--count-only",
+            action="store_true",
+            help="Only count the solutions, without outputting them"
+        )
+        super().add_argument(
+            "--sample",
+            action=StrictlyPositive,
+            type=int,
+            default=None,
+            help="Draw # uniformly random tilings instead of searching all "
+            "the solutions (default: none)"
+        )
+        super().add_argument(
+            "--estimate",
+            action="store_true",
+            help="Print the estimated size of the tree and solve time, "
+            "without solving the puzzle"
+        )
         super().add_argument(
             "--stats",
             action="store_true",
             help="Save puzzle solving statistics in CSV format"
         )
+        super().add_argument(
+            "--engine",
+            choices=[
+                "numpy",
+                "iterative",
+                "bitboard",
+                "cell",
+                "bitset",
+                "frontier",
+                "dlx",
+                "memo",
+                "profile"
+            ],
+            default=None,
+            help="Tree crawler engine (default: numpy)"
+        )
+        super().add_argument(
+            "--memo-size",
+            action=StrictlyPositive,
+            type=int,
+            default=MEMO_CAPACITY,
+            help="Maximum number of entries of the memo engine table "
+            "(default: {})".format(MEMO_CAPACITY)
+        )
+        super().add_argument(
+            "--prune",
+            choices=["size", "shape"],
+            default=None,
+            help="Prune the partial boards leaving empty regions whose size "
+            "is not a multiple of 4 (size), or which can't be filled by a "
+            "remaining piece (shape). Bitboard, cell and frontier engines "
+            "only"
+        )
+        super().add_argument(
+            "--frontier-memory",
+            action=StrictlyPositive,
+            type=int,
+            default=FRONTIER_MEMORY,
+            help="Memory budget in megabytes of the breadth first levels of "
+            "the frontier engine, per crawler (default: {})"
+            .format(FRONTIER_MEMORY)
+        )
+        super().add_argument(
+            "--jobs",
+            action=StrictlyPositive,
+            type=int,
+            default=None,
+            help="Number of crawler processes, or of worker processes "
+            "expected when serving (default: usable CPU count, 64 when "
+            "serving)"
+        )
+        super().add_argument(
+            "--pin",
+            action="store_true",
+            help="Pin each crawler process to one CPU"
+        )
+        super().add_argument(
+            "--split-depth",
+            action=Positive,
+            type=int,
+            default=None,
+            help="Number of tree levels to split in crawler tasks "
+            "(default: automatic)"
+        )
+        super().add_argument(
+            "--batch-size",
+            action=StrictlyPositive,
+            type=int,
+            default=64,
+            help="Number of solutions sent together by a crawler process "
+            "(default: 64)"
+        )
+        super().add_argument(
+            "--flush-interval",
+            action=Positive,
+            type=float,
+            default=1.0,
+            help="Maximum number of seconds a solution waits in a crawler "
+            "batch (default: 1.0)"
+        )
+        super().add_argument(
+            "--checkpoint",
+            default=None,
+            metavar="FILE",
+            help="Save periodically the crawler tasks not finished and the "
+            "solutions found in FILE. Crawler engines only"
+        )
+        super().add_argument(
+            "--checkpoint-interval",
+            action=Positive,
+            type=float,
+            default=60.0,
+            help="Number of seconds between two checkpoints (default: 60)"
+        )
+        super().add_argument(
+            "--resume",
+            action="store_true",
+            help="Resume the solve from the checkpoint file, if it exists"
+        )
+        super().add_argument(
+            "--progress-interval",
+            action=StrictlyPositive,
+            type=float,
+            default=10.0,
+            help="Number of seconds between two progress reports, printed "
+            "in verbose mode (default: 10)"
+        )
+        super().add_argument(
+            "--progress-file",
+            default=None,
+            metavar="FILE",
+            help="Append the progress reports to FILE as JSON lines. "
+            "Crawler engines only"
+        )
+        super().add_argument(
+            "--timeout",
+            action=StrictlyPositive,
+            type=float,
+            default=None,
+            metavar="SECONDS",
+            help="Stop the solve after SECONDS and output the solutions "
+            "found so far (default: no limit)"
+        )
+        super().add_argument(
+            "--max-nodes",
+            action=StrictlyPositive,
+            type=int,
+            default=None,
+            metavar="N",
+            help="Stop the solve after N tree nodes crawled and output the "
+            "solutions found so far. Crawler engines only (default: no limit)"
+        )
+        super().add_argument(
+            "--max-solutions",
+            action=StrictlyPositive,
+            type=int,
+            default=None,
+            metavar="N",
+            help="Stop the solve after N solutions found (default: no limit)"
+        )
+        super().add_argument(
+            "--serve",
+            action=ValidAddress,
+            default=None,
+            metavar="HOST:PORT",
+            help="Serve the crawler tasks to the workers (tppy.py worker) "
+            "connecting on HOST:PORT instead of crawling them. Crawler "
+            "engines only"
+        )
+        super().add_argument(
+            "--authkey",
+            default=AUTHKEY,
+            metavar="KEY",
+            help="Authentication key of the workers connections "
+            "(default: {})".format(AUTHKEY)
+        )
         self.__group_board.add_argument(
             "--rows",
             action=StrictlyPositive,
@@ -332,6 +556,11 @@ class TalosArguments(ArgumentParser):
             action="store_true",
             help="Output solutions as png images"
         )
+        self.__group_solutions.add_argument(
+            "--symmetries",
+            action="store_true",
+            help="Output the symmetrical solutions of each solution"
+        )
         self.__group_solutions.add_argument(
             "--output-dir",
             action=WriteableDir,
@@ -377,6 +606,169 @@ class TalosArguments(ArgumentParser):
                 "Board size must equal sum of pieces size (4)",
                 "--rows x --columns"
             )
+        if self.__args.resume and not self.__args.checkpoint:
+            raise TalosArgumentError(
+                "Resume needs a checkpoint file",
+                "--resume"
+            )
+        if self.__args.count_only and self.__args.checkpoint:
+            raise TalosArgumentError(
+                "Count only can't be checkpointed",
+                "--count-only"
+            )
+        if self.__args.sample and (
+            self.__args.first
+            or self.__args.count_only
+            or self.__args.checkpoint
+            or self.__args.serve
+            or self.__args.engine
+            or self.__args.prune
+            or self.__args.timeout
+            or self.__args.max_nodes
+            or self.__args.max_solutions
+        ):
+            raise TalosArgumentError(
+                "Sample draws the tilings with the memoized counts, without "
+                "first, count only, checkpoint, serve, engine, prune or "
+                "budget",
+                "--sample"
+            )
+        # The engine is only checked against sample when it is given
+        if self.__args.engine is None:
+            self.__args.engine = "numpy"
+        if self.__args.estimate and (
+            self.__args.engine in ("dlx", "memo", "profile")
+            or self.__args.sample
+        ):
+            raise TalosArgumentError(
+                "Estimate needs a crawler engine, without sample",
+                "--estimate"
+            )
+        if self.__args.engine in ("memo", "profile") and (
+            self.__args.first
+            or self.__args.count_only
+            or self.__args.prune
+            or self.__args.checkpoint
+            or self.__args.timeout
+            or self.__args.max_nodes
+            or self.__args.max_solutions
+        ):
+            raise TalosArgumentError(
+                "Memo and profile engines only count the tilings, without "
+                "first, count only, prune, checkpoint or budget",
+                "--engine"
+            )
+        if self.__args.engine == "dlx" and (
+            self.__args.checkpoint
+            or self.__args.max_nodes
+            or self.__args.progress_file
+        ):
+            raise TalosArgumentError(
+                "Dlx engine has no crawler tasks or tree nodes, without "
+                "checkpoint, max nodes or progress file",
+                "--engine"
+            )
+        if self.__args.prune and self.__args.engine not in (
+            "bitboard",
+            "cell",
+            "frontier"
+        ):
+            raise TalosArgumentError(
+                "Prune needs the bitboard, cell or frontier engine",
+                "--prune"
+            )
+        if (
+            self.__args.engine in ("memo", "profile") or self.__args.sample
+        ) and max(
+            self.__args.square,
+            self.__args.l_right,
+            self.__args.l_left,
+            self.__args.bar,
+            self.__args.tee,
+            self.__args.step_right,
+            self.__args.step_left
+        ) >= 1 << COUNT_BITS:
+            raise TalosArgumentError(
+                "Memo and profile engines and sample count at most {} pieces "
+                "of a shape".format((1 << COUNT_BITS) - 1),
+                "--engine"
+            )
+        if self.__args.serve and (
+            self.__args.engine in ("dlx", "memo", "profile")
+            or self.__args.checkpoint
+            or self.__args.timeout
+            or self.__args.max_nodes
+            or self.__args.max_solutions
+        ):
+            raise TalosArgumentError(
+                "Serve needs a crawler engine, without checkpoint or budget",
+                "--serve"
+            )
+
+    def __call__(self):
+        """Class is callable. Return the args component
+
+        Return: argparse.args
+        """
+
+        return self.__args
+
+
+class WorkerArguments(ArgumentParser):
+    """Parse the worker command line (tppy.py worker), check and provide the
+    arguments
+
+    Inherit:
+        argparse.ArgumentParser
+    Private members:
+        Attributes:
+            __args: argparse.args - worker command line arguments
+    Special methods:
+        __init__: extend ArgumentParser constructor
+        __call__: return the args attributes of ArgumentParser
+    Exceptions:
+        TalosArgumentError: error in argument parsing
+    """
+
+    def __init__(self, argv):
+        """Extend ArgumentParser constructor. Parse and check worker command
+        line arguments
+
+        Inputs:
+            argv: list of strings - worker command line arguments, after
+                the worker command
+        Exceptions:
+            TalosArgumentError: invalid argument
+        """
+        # Init parser from super class
+        super().__init__(
+            prog="tppy.py worker",
+            description=WORKER_DESCRIPTION_TEXT
+        )
+        super().add_argument(
+            "--connect",
+            action=ValidAddress,
+            required=True,
+            metavar="HOST:PORT",
+            help="Address of the coordinator"
+        )
+        super().add_argument(
+            "--jobs",
+            action=StrictlyPositive,
+            type=int,
+            default=None,
+            help="Number of worker processes (default: usable CPU count)"
+        )
+        super().add_argument(
+            "--authkey",
+            default=AUTHKEY,
+            metavar="KEY",
+            help="Authentication key of the connection "
+            "(default: {})".format(AUTHKEY)
+        )
+
+        # Get parameters
+        self.__args = super().parse_args(argv)
 
     def __call__(self):
         """Class is callable. Return the args component
@@ -7,12 +7,25 @@ Classes:
     PositionsStackCollection: collection of PositionsStack - all posibble
         positions of puzzle pieces on the board
     PositionsStack: all possible positions of one piece on the board
+    CellsIndex: positions of each piece type by anchor cell
+    PositionsCompatibility: compatible positions of each pair of stacks
+    SharedPositions: positions of the collection in shared memory
+Attributes:
+    FLIPS: const tuple of strings - board symmetries: vertical, horizontal
+        and central
 Dependencies:
+    sys
+    multiprocessing
     numpy
 """
 
+import sys
+from multiprocessing.shared_memory import SharedMemory
+
 import numpy
 
+FLIPS = ("V", "H", "HV")
+
 
 class PositionsStackCollection(object):
     """Define a collection of pieces positions to solve the puzzle
@@ -20,14 +33,36 @@ class PositionsStackCollection(object):
     Public members:
         Properties:
             combinations_count: integer - total number of combinations
+            masks: list of list of integers - positions bitmasks per stack
+            copies: list of booleans - stacks which are a copy of the
+                previous stack piece
+            symmetries: list of integers - board symmetries (FLIPS indexes)
+                which transform any solution in another solution
+            roots: list of integers - positions of the first stack to use as
+                tree roots
         Methods:
             add: create and append a positions stack to the collection
             optimize: optimize the tree crawling by ordering the collection
                 from the smallest number of positions to the biggest
+            break_symmetries: restrict the tree roots to one position per
+                class of symmetrical positions
+            cells_index: build the index of positions by anchor cell
+            compatibility: build the compatible positions bitsets of each
+                pair of stacks
+            shared: publish the positions in shared memory
+            matrix: positions of a stack as a (positions, cells) matrix
     Private members:
         Attributes:
             __stack: list of PositionsStack - store the positions for pieces
             __combinations_count: integer - total number of combinations
+            __board_cells: integer - # of cells of the board
+            __copies: list of booleans - stacks which are a copy of the
+                previous stack piece
+            __roots: list of integers - positions of the first stack to use
+                as tree roots, None for all positions
+        Methods:
+            __update_copies: find the stacks which are a copy of the previous
+                stack piece
     Special methods:
         __init__: override object constructor
         __len__: provide len method, # of items in the collection
@@ -40,6 +75,12 @@ class PositionsStackCollection(object):
         self.__stack = []
         # Total combinations count
         self.__combinations_count = 1
+        # Board size
+        self.__board_cells = 0
+        # Copies of pieces
+        self.__copies = []
+        # Tree roots
+        self.__roots = None
 
     def __len__(self):
         """Provide len method, # of items in the collection
@@ -65,6 +106,56 @@ class PositionsStackCollection(object):
 
         return self.__combinations_count
 
+    @property
+    def masks(self):
+        """list of list of integers - positions bitmasks of each stack"""
+
+        return [stack.masks for stack in self.__stack]
+
+    @property
+    def copies(self):
+        """list of booleans - True for the stacks of the same piece as the
+        previous stack. The positions of the copies of a piece are combined
+        in increasing order of their indexes, to combine each set of
+        positions only once.
+        """
+
+        return self.__copies
+
+    @property
+    def symmetries(self):
+        """list of integers - board symmetries (FLIPS indexes) which
+        transform the positions of each stack in positions of the same stack,
+        then any solution in another solution. Flips change the shape of the
+        chiral pieces (L and Step), only the central symmetry keeps it.
+        """
+
+        return [
+            flip for flip in range(len(FLIPS))
+            if all(
+                None not in [flips[flip] for flips in stack.flips]
+                for stack in self.__stack
+            )
+        ]
+
+    @property
+    def roots(self):
+        """list of integers - positions of the first stack to use as tree
+        roots, after symmetries breaking
+        """
+
+        if self.__roots is None:
+            return list(range(len(self.__stack[0])))
+        return self.__roots
+
+    def __update_copies(self):
+        """Find the stacks which are a copy of the previous stack piece"""
+
+        self.__copies = [
+            stack_idx > 0 and stack.piece is self.__stack[stack_idx - 1].piece
+            for stack_idx, stack in enumerate(self.__stack)
+        ]
+
     def add(self, piece, board_rows, board_columns):
         """Create and add a stack of positions to the collection, for
         the given piece and board
@@ -78,15 +169,92 @@ class PositionsStackCollection(object):
         positions_stack = PositionsStack(piece, board_rows, board_columns)
         self.__stack.append(positions_stack)
         self.__combinations_count *= len(positions_stack)
+        self.__board_cells = board_rows * board_columns
+        self.__update_copies()
 
     def optimize(self):
         """Sort the collection of positions stacks, from smallest
-        number of positions to biggest
+        number of positions to biggest. The sort is stable, the stacks of
+        the copies of a piece stay together.
         """
 
         if self.__stack:
             self.__stack.sort(key=lambda stack: len(stack))
             # self.__stack.insert(0, self.__stack.pop())
+            self.__update_copies()
+
+    def break_symmetries(self):
+        """Restrict the tree roots to one position per class of symmetrical
+        positions, so that each class of symmetrical solutions is searched
+        only once. The piece with the fewest positions among the pieces
+        without copies becomes the first one, its positions are the roots.
+
+        Return: Piece - the piece whose positions are restricted, None if the
+            board has no symmetry or all the pieces have copies
+        """
+
+        symmetries = self.symmetries
+        singles = [
+            stack_idx for stack_idx in range(len(self.__stack))
+            if not self.__copies[stack_idx] and not (
+                stack_idx + 1 < len(self.__stack)
+                and self.__copies[stack_idx + 1]
+            )
+        ]
+        if not symmetries or not singles:
+            return None
+        # Move the smallest piece without copies first
+        self.__stack.insert(0, self.__stack.pop(singles[0]))
+        self.__update_copies()
+        # Keep the first position of each class of symmetrical positions
+        flips = self.__stack[0].flips
+        self.__roots = [
+            position_idx for position_idx in range(len(flips))
+            if all(
+                position_idx <= flips[position_idx][flip]
+                for flip in symmetries
+            )
+        ]
+        return self.__stack[0].piece
+
+    def cells_index(self):
+        """Build the index of the positions by anchor cell, for the current
+        order of the collection
+
+        Return: CellsIndex - positions of each piece type by anchor cell
+        """
+
+        return CellsIndex(self, self.__board_cells)
+
+    def compatibility(self):
+        """Build the compatible positions bitsets of each pair of stacks, for
+        the current order of the collection
+
+        Return: PositionsCompatibility - compatible positions of each pair of
+            stacks
+        """
+
+        return PositionsCompatibility(self)
+
+    def shared(self):
+        """Publish the positions in shared memory, for the current order of
+        the collection
+
+        Return: SharedPositions - positions of the collection in shared
+            memory
+        """
+
+        return SharedPositions(self)
+
+    def matrix(self, stack_idx):
+        """Positions of a stack as a (positions, cells) matrix
+
+        Inputs:
+            stack_idx: integer - index of the stack
+        Return: numpy array - flattened positions of the stack
+        """
+
+        return self.__stack[stack_idx].matrix
 
 
 class PositionsStack(object):
@@ -95,10 +263,23 @@ class PositionsStack(object):
     Public members:
         Properties:
             piece: Piece - the piece of which we have the positions
+            masks: list of integers - positions as board bitmasks
+            flips: list of tuples of integers - symmetrical positions of
+                each position
+            matrix: numpy array - positions as a (positions, cells) matrix
     Private members:
         Attributes:
-            __stack: list of numpy arrays - store the positions for the piece
             __piece: Piece - the piece of which we have the positions
+            __stack: list of numpy arrays - store the positions for the piece
+            __matrix: numpy array - flattened positions, one row per
+                position
+            __masks: list of integers - positions as board bitmasks, bit
+                (row * board_columns + column) set for each covered cell
+            __flips: list of tuples of integers - for each position, index
+                of its symmetrical position by each of the FLIPS, None if it
+                is not a position of the piece
+        Methods:
+            __mask: bitmask of a board
     Special methods:
         __init__: override object constructor
         __len__: provide len method, # of items in the list
@@ -119,6 +300,8 @@ class PositionsStack(object):
         self.__piece = piece
         # Positions stack
         self.__stack = []
+        # Positions bitmasks stack
+        self.__masks = []
         # Loop over all piece patterns and add position to the stack
         for pattern in self.__piece.patterns:
             # Loop over the board cells
@@ -140,6 +323,43 @@ class PositionsStack(object):
                     ] += pattern
                     # Add it to the position stack
                     self.__stack.append(board)
+                    # Add its bitmask to the bitmasks stack
+                    self.__masks.append(self.__mask(board))
+        # Positions flattened in one contiguous matrix, to test all of them
+        # against a board at once
+        self.__matrix = numpy.zeros(
+            (len(self.__stack), board_rows * board_columns),
+            numpy.uint8
+        )
+        for position_idx, board in enumerate(self.__stack):
+            self.__matrix[position_idx] = board.ravel()
+        # Find the symmetrical positions of each position
+        positions_idx = {
+            mask: position_idx
+            for position_idx, mask in enumerate(self.__masks)
+        }
+        self.__flips = [
+            tuple(
+                positions_idx.get(self.__mask(flipped))
+                for flipped in (board[::-1], board[:, ::-1], board[::-1, ::-1])
+            )
+            for board in self.__stack
+        ]
+
+    @staticmethod
+    def __mask(board):
+        """Bitmask of a board
+
+        Inputs:
+            board: numpy array - the board
+        Return: integer - bitmask with bit (row * board_columns + column) set
+            for each covered cell
+        """
+
+        mask = 0
+        for cell in numpy.flatnonzero(board):
+            mask |= 1 << int(cell)
+        return mask
 
     def __getitem__(self, index):
         """Ovverride '[]' (indexer) operator for the collection
@@ -164,3 +384,387 @@ class PositionsStack(object):
         """Piece - the piece of which we store the positions"""
 
         return self.__piece
+
+    @property
+    def masks(self):
+        """list of integers - positions as board bitmasks"""
+
+        return self.__masks
+
+    @property
+    def matrix(self):
+        """numpy array - positions as a (positions, cells) matrix, one
+        flattened position per row
+        """
+
+        return self.__matrix
+
+    @property
+    def flips(self):
+        """list of tuples of integers - symmetrical positions of each
+        position, by each of the FLIPS (None if not a position of the piece)
+        """
+
+        return self.__flips
+
+
+class CellsIndex(object):
+    """Positions of each piece type, indexed by their anchor cell
+
+    The anchor of a position is its first cell in the board scan order
+    (lowest bit of its bitmask). Any tiling has to cover the first empty cell
+    of a partial board with a position anchored on this cell. Copies of the
+    same piece are one piece type, filled in the order of their stacks.
+
+    Public members:
+        Properties:
+            types: list of list of integers - stacks indexes of each type
+        Methods:
+            used: count the pieces of each type used by a tree path
+    Private members:
+        Attributes:
+            __types: list of list of integers - stacks indexes of each type
+            __types_of_stacks: list of integers - type of each stack
+            __cells: list of list of tuples (type, position, mask) - positions
+                anchored on each cell
+    Special methods:
+        __init__: override object constructor
+        __len__: provide len method, # of cells of the board
+        __getitem__: provide indexer ([]) operator, positions of a cell
+    """
+
+    def __init__(self, positions, board_cells):
+        """Build the index from the positions collection
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions
+            board_cells: integer - # of cells of the board
+        """
+
+        # Group the stacks of the same piece in one type
+        self.__types = []
+        self.__types_of_stacks = []
+        types_pieces = []
+        for stack_idx, stack in enumerate(positions):
+            if stack.piece in types_pieces:
+                type_idx = types_pieces.index(stack.piece)
+                self.__types[type_idx].append(stack_idx)
+            else:
+                type_idx = len(types_pieces)
+                types_pieces.append(stack.piece)
+                self.__types.append([stack_idx])
+            self.__types_of_stacks.append(type_idx)
+        # Index the positions of the first stack of each type by anchor cell,
+        # the first stack being restricted to the tree roots positions
+        self.__cells = [[] for cell in range(board_cells)]
+        roots = set(positions.roots)
+        for type_idx, stacks in enumerate(self.__types):
+            for position_idx, mask in enumerate(positions[stacks[0]].masks):
+                if stacks[0] == 0 and position_idx not in roots:
+                    continue
+                anchor = (mask & -mask).bit_length() - 1
+                self.__cells[anchor].append((type_idx, position_idx, mask))
+
+    def __len__(self):
+        """Provide len method, # of cells of the board
+
+        Return: integer - # of cells of the board
+        """
+
+        return len(self.__cells)
+
+    def __getitem__(self, cell):
+        """Provide indexer ([]) operator, positions anchored on a cell
+
+        Inputs:
+            cell: integer - index of the cell in the board scan order
+        Return: list of tuples (type, position, mask) - anchored positions
+        """
+
+        return self.__cells[cell]
+
+    @property
+    def types(self):
+        """list of list of integers - stacks indexes of each piece type"""
+
+        return self.__types
+
+    def used(self, tree_path):
+        """Count the pieces of each type used by the given tree path
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - tree path
+        Return: list of integers - # of used pieces for each type
+        """
+
+        used = [0 for stacks in self.__types]
+        for node in tree_path:
+            used[self.__types_of_stacks[node[0]]] += 1
+        return used
+
+
+class PositionsCompatibility(object):
+    """Compatible positions of each pair of stacks, as bitsets
+
+    For a position of a stack and each following stack, the bitset has the
+    bit of each position of the following stack which doesn't overlap it
+    (and which follows it, for the next copy of the same piece). The valid
+    positions of the remaining stacks for a tree path are the intersection
+    of the bitsets of its nodes.
+
+    Public members:
+        Properties:
+            memory: integer - memory footprint of the bitsets in bytes
+        Methods:
+            candidates: valid positions of the remaining stacks for a tree
+                path
+    Private members:
+        Attributes:
+            __sizes: list of integers - # of positions of each stack
+            __bitsets: list of list of list of integers - for each stack and
+                each of its positions, the compatible positions bitset of
+                each following stack
+    Special methods:
+        __init__: override object constructor
+        __len__: provide len method, # of stacks
+        __getitem__: provide indexer ([]) operator, bitsets of a stack
+    """
+
+    def __init__(self, positions):
+        """Build the bitsets from the positions collection
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions
+        """
+
+        masks = positions.masks
+        copies = positions.copies
+        self.__sizes = [len(stack) for stack in masks]
+        self.__bitsets = []
+        for stack_idx, stack in enumerate(masks):
+            stack_bitsets = []
+            for position_idx, mask in enumerate(stack):
+                position_bitsets = []
+                for next_idx in range(stack_idx + 1, len(masks)):
+                    # Next copy of the piece only after the position
+                    start = 0
+                    if next_idx == stack_idx + 1 and copies[next_idx]:
+                        start = position_idx + 1
+                    bitset = 0
+                    next_stack = masks[next_idx]
+                    for next_position_idx in range(start, len(next_stack)):
+                        if not mask & next_stack[next_position_idx]:
+                            bitset |= 1 << next_position_idx
+                    position_bitsets.append(bitset)
+                stack_bitsets.append(position_bitsets)
+            self.__bitsets.append(stack_bitsets)
+
+    def __len__(self):
+        """Provide len method, # of stacks
+
+        Return: integer - # of stacks
+        """
+
+        return len(self.__bitsets)
+
+    def __getitem__(self, stack_idx):
+        """Provide indexer ([]) operator, bitsets of a stack
+
+        Inputs:
+            stack_idx: integer - index of the stack
+        Return: list of list of integers - for each position of the stack,
+            the compatible positions bitset of each following stack
+        """
+
+        return self.__bitsets[stack_idx]
+
+    @property
+    def memory(self):
+        """integer - memory footprint of the bitsets in bytes"""
+
+        memory = sys.getsizeof(self.__bitsets)
+        for stack_bitsets in self.__bitsets:
+            memory += sys.getsizeof(stack_bitsets)
+            for position_bitsets in stack_bitsets:
+                memory += sys.getsizeof(position_bitsets)
+                memory += sum(
+                    sys.getsizeof(bitset) for bitset in position_bitsets
+                )
+        return memory
+
+    def candidates(self, tree_path):
+        """Valid positions of the remaining stacks for a tree path, from the
+        first stack in piece order
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - tree path
+        Return: list of integers - valid positions bitset of each stack
+            after the tree path
+        """
+
+        candidates = [
+            (1 << size) - 1 for size in self.__sizes[len(tree_path):]
+        ]
+        for stack_idx, position_idx in tree_path:
+            bitsets = self.__bitsets[stack_idx][position_idx]
+            offset = len(tree_path) - stack_idx - 1
+            candidates = [
+                candidate & bitset
+                for candidate, bitset in zip(candidates, bitsets[offset:])
+            ]
+        return candidates
+
+
+class SharedPositions(object):
+    """Positions of a collection in shared memory, for the numpy crawler
+    processes
+
+    The positions of all the stacks follow each other in one contiguous
+    (positions, rows, columns) array, in a multiprocessing shared memory
+    block. Pickling only sends the name of the block and the layout of the
+    array: the crawler processes attach to the block and use views of the
+    array, without copying the positions.
+
+    Public members:
+        Properties:
+            copies: list of booleans - stacks which are a copy of the
+                previous stack piece
+        Methods:
+            release: detach from the shared memory block
+            matrix: positions of a stack as a (positions, cells) matrix
+    Private members:
+        Attributes:
+            __memory: multiprocessing.shared_memory.SharedMemory - shared
+                memory block of the positions
+            __owner: boolean - True in the process which created the block
+            __shape: tuple of integers - shape of the positions array
+            __offsets: list of integers - index of the first position of
+                each stack, followed by the # of positions
+            __copies: list of booleans - stacks which are a copy of the
+                previous stack piece
+            __stacks: list of numpy arrays - positions of each stack, views
+                of the shared memory block
+            __matrices: list of numpy arrays - positions of each stack as a
+                (positions, cells) matrix, views of the shared memory block
+        Methods:
+            __attach: create the stacks views of the shared memory block
+    Special methods:
+        __init__: override object constructor
+        __len__: provide len method, # of stacks
+        __getitem__: provide indexer ([]) operator, positions of a stack
+        __getstate__: pickle the name of the block and the array layout
+        __setstate__: attach to the block of the pickled name
+    """
+
+    def __init__(self, positions):
+        """Copy the positions of the collection in a new shared memory block
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions
+        """
+
+        self.__offsets = [0]
+        for stack in positions:
+            self.__offsets.append(self.__offsets[-1] + len(stack))
+        self.__shape = (self.__offsets[-1],) + positions[0][0].shape
+        self.__copies = positions.copies
+        self.__memory = SharedMemory(
+            create=True,
+            size=max(int(numpy.prod(self.__shape)), 1)
+        )
+        self.__owner = True
+        self.__attach()
+        for stack_idx, stack in enumerate(positions):
+            for position_idx, position in enumerate(stack):
+                self.__stacks[stack_idx][position_idx] = position
+
+    def __attach(self):
+        """Create the stacks views of the shared memory block"""
+
+        array = numpy.ndarray(
+            self.__shape,
+            numpy.uint8,
+            buffer=self.__memory.buf
+        )
+        self.__stacks = [
+            array[start:stop]
+            for start, stop in zip(self.__offsets, self.__offsets[1:])
+        ]
+        cells = self.__shape[1] * self.__shape[2]
+        self.__matrices = [
+            stack.reshape(len(stack), cells) for stack in self.__stacks
+        ]
+
+    def __getstate__(self):
+        """Pickle the name of the shared memory block and the array layout,
+        not the positions
+
+        Return: tuple - pickled state
+        """
+
+        return (self.__memory.name, self.__shape, self.__offsets,
+                self.__copies)
+
+    def __setstate__(self, state):
+        """Attach to the shared memory block of the pickled name
+
+        Inputs:
+            state: tuple - pickled state
+        """
+
+        name, self.__shape, self.__offsets, self.__copies = state
+        self.__memory = SharedMemory(name=name)
+        self.__owner = False
+        self.__attach()
+
+    def __len__(self):
+        """Provide len method, # of stacks
+
+        Return: integer - # of stacks
+        """
+
+        return len(self.__stacks)
+
+    def __getitem__(self, stack_idx):
+        """Provide indexer ([]) operator, positions of a stack
+
+        Inputs:
+            stack_idx: integer - index of the stack
+        Return: numpy array - positions of the stack, view of the shared
+            memory block
+        """
+
+        return self.__stacks[stack_idx]
+
+    def matrix(self, stack_idx):
+        """Positions of a stack as a (positions, cells) matrix
+
+        Inputs:
+            stack_idx: integer - index of the stack
+        Return: numpy array - flattened positions of the stack, view of the
+            shared memory block
+        """
+
+        return self.__matrices[stack_idx]
+
+    @property
+    def copies(self):
+        """list of booleans - True for the stacks of the same piece as the
+        previous stack
+        """
+
+        return self.__copies
+
+    def release(self):
+        """Detach from the shared memory block, and destroy it in the process
+        which created it. The positions can't be used anymore.
+        """
+
+        self.__stacks = []
+        self.__matrices = []
+        self.__memory.close()
+        if self.__owner:
+            self.__memory.unlink()
@@ -0,0 +1,123 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Broken profile dynamic programming count of the tilings of the board
+
+Name: tpprofile.py
+Comments:
+    The cells of the board are scanned column by column (row by row if the
+    board is higher than wide), so that the scan goes along the long side
+    of the board. A piece is placed by its first cell in the scan order and
+    spans at most 4 columns: the cells it covers beyond the current cell
+    are in a window of 4 columns. The state of the scan at a cell is the
+    occupancy of the window starting at the cell (the broken profile) and
+    the counts of the pieces remaining, and the # of partial tilings
+    reaching each state is carried from cell to cell: the states reached by
+    different placements are merged, instead of crawling them one by one.
+    All the tilings are counted, the symmetrical ones included, and the
+    copies of a piece are not distinguished.
+Classes:
+    ProfileCounter: broken profile count of the tilings
+Dependencies:
+    tpmemo
+"""
+
+from tpmemo import COUNT_BITS
+
+
+class ProfileCounter(object):
+    """Broken profile dynamic programming count of the tilings of the board
+
+    Public members:
+        Methods:
+            count: count the tilings of the board
+        Properties:
+            max_states: integer - max # of states of a scan step
+    Private members:
+        Attributes:
+            __cells: list of list of tuples (shift, mask) - positions of
+                each piece type by first cell in the scan order: shift of
+                the type count in the remaining pieces and position bitmask
+                in the window of the cell
+            __remaining: integer - remaining pieces counts of the empty
+                board, COUNT_BITS bits per piece type
+            __max_states: integer - max # of states of a scan step
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, positions, board_rows, board_columns):
+        """Override object constructor
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions, built from the pieces set
+            board_rows: integer - # rows of the puzzle
+            board_columns: integer - # columns of the puzzle
+        """
+
+        board_cells = board_rows * board_columns
+        # Scan order of each cell (row * board_columns + column)
+        if board_columns >= board_rows:
+            order = [
+                column * board_rows + row
+                for row in range(board_rows)
+                for column in range(board_columns)
+            ]
+        else:
+            order = list(range(board_cells))
+        # Group the stacks of the same piece in one type, all the positions
+        # of the first stack of each type indexed by first scanned cell
+        types_pieces = []
+        self.__cells = [[] for cell in range(board_cells)]
+        self.__remaining = 0
+        for stack_idx in range(len(positions)):
+            stack = positions[stack_idx]
+            if stack.piece not in types_pieces:
+                types_pieces.append(stack.piece)
+                shift = COUNT_BITS * (len(types_pieces) - 1)
+                for mask in stack.masks:
+                    scanned = 0
+                    while mask:
+                        lowest = mask & -mask
+                        scanned |= 1 << order[lowest.bit_length() - 1]
+                        mask ^= lowest
+                    first = (scanned & -scanned).bit_length() - 1
+                    self.__cells[first].append((shift, scanned >> first))
+            shift = COUNT_BITS * types_pieces.index(stack.piece)
+            self.__remaining += 1 << shift
+        self.__max_states = 0
+
+    @property
+    def max_states(self):
+        """integer - max # of states of a scan step"""
+
+        return self.__max_states
+
+    def count(self):
+        """Count the tilings of the board
+
+        Return: integer - # of tilings, the symmetrical ones included
+        """
+
+        limit = (1 << COUNT_BITS) - 1
+        # # of partial tilings by state (window occupancy, remaining pieces)
+        states = {(0, self.__remaining): 1}
+        for positions in self.__cells:
+            self.__max_states = max(self.__max_states, len(states))
+            following = {}
+            for (window, remaining), count in states.items():
+                if window & 1:
+                    # Cell already covered
+                    state = (window >> 1, remaining)
+                    following[state] = following.get(state, 0) + count
+                    continue
+                # Cover the cell with a remaining piece
+                for shift, position in positions:
+                    if remaining >> shift & limit and not window & position:
+                        state = (
+                            (window | position) >> 1,
+                            remaining - (1 << shift)
+                        )
+                        following[state] = following.get(state, 0) + count
+            states = following
+        return states.get((0, 0), 0)
@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Progress reports of a solve
+
+Name: tpprogress.py
+Comments:
+    A progress report gives the crawler tasks finished out of the queued
+    ones, the tree nodes crawled and the crawling rate since the previous
+    report, the branches cut by the pruning, the solutions found by the
+    crawlers and the estimated time remaining, from the fraction of the
+    tasks finished. It's printed on stdout (verbose mode) and/or appended as
+    a JSON line to a progress file, for the dashboards.
+Classes:
+    Progress: periodic progress reports
+Attributes:
+    PROGRESS_INTERVAL: const float - default # of seconds between two
+        reports
+Dependencies:
+    datetime
+    json
+    time
+    tperrors
+"""
+
+import json
+from datetime import timedelta
+from time import monotonic, time
+
+from tperrors import TalosFileSystemError
+
+PROGRESS_INTERVAL = 10.0
+
+
+class Progress(object):
+    """Periodic progress reports of a solve
+
+    Public members:
+        Methods:
+            due: test if the report interval is over
+            report: report the progress
+    Private members:
+        Attributes:
+            __interval: float - # of seconds between two reports
+            __verbose: boolean - print the reports on stdout
+            __path: string - progress file path, None if none
+            __start: float - monotonic time of the solve start
+            __last: tuple (float, integer) - monotonic time and # of nodes of
+                the previous report
+    Special methods:
+        __init__: override object constructor
+    Exceptions:
+        TalosFileSystemError: error in saving the progress
+    """
+
+    def __init__(self, interval=PROGRESS_INTERVAL, verbose=False, path=None):
+        """Override object constructor, the solve starts
+
+        Inputs:
+            interval: float, optional, PROGRESS_INTERVAL - # of seconds
+                between two reports
+            verbose: boolean, optional, False - print the reports on stdout
+            path: string, optional, None - progress file path, where the
+                reports are appended as JSON lines
+        """
+
+        self.__interval = interval
+        self.__verbose = verbose
+        self.__path = path
+        self.__start = monotonic()
+        self.__last = (self.__start, 0)
+
+    def due(self):
+        """Test if the report interval is over since the previous report
+
+        Return: boolean - True if the progress has to be reported
+        """
+
+        return monotonic() >= self.__last[0] + self.__interval
+
+    def report(self, tasks_done, tasks, counters):
+        """Report the progress
+
+        Inputs:
+            tasks_done: integer - # of crawler tasks finished
+            tasks: integer - # of crawler tasks queued
+            counters: dict of integers - crawlers counters: tree nodes
+                crawled (nodes), branches cut by the pruning (pruned) and
+                solutions found (solutions)
+        Exceptions:
+            TalosFileSystemError: error in saving the progress
+        """
+
+        now = monotonic()
+        elapsed = now - self.__start
+        last_time, last_nodes = self.__last
+        rate = 0.0
+        if now > last_time:
+            rate = (counters["nodes"] - last_nodes) / (now - last_time)
+        self.__last = (now, counters["nodes"])
+        eta = None
+        if tasks_done:
+            eta = elapsed * (tasks - tasks_done) / tasks_done
+        if self.__verbose:
+            print(
+                "Info: Progress {}/{} tasks, {} nodes ({} nodes/s), {} "
+                "solutions, remaining {}"
+                .format(
+                    tasks_done,
+                    tasks,
+                    "{:,d}".format(counters["nodes"]).replace(",", " "),
+                    "{:,.0f}".format(rate).replace(",", " "),
+                    "{:,d}".format(counters["solutions"]).replace(",", " "),
+                    "unknown" if eta is None else timedelta(seconds=int(eta))
+                ),
+                flush=True
+            )
+        if self.__path:
+            line = {
+                "time": time(),
+                "elapsed": elapsed,
+                "tasks_done": tasks_done,
+                "tasks": tasks,
+                "nodes": counters["nodes"],
+                "nodes_per_second": rate,
+                "pruned": counters["pruned"],
+                "solutions": counters["solutions"],
+                "eta": eta
+            }
+            try:
+                with open(self.__path, "a") as f:
+                    f.write(json.dumps(line) + "\n")
+            except OSError as err:
+                message = "Error: Can't save progress in file " + self.__path
+                raise TalosFileSystemError(message, err)
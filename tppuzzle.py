@@ -5,29 +5,72 @@
 Name: tppuzzle.py
 Classes:
     Puzzle: the Puzzle
+Attributes:
+    STATS_COLUMNS: const tuple of strings - columns of the stats file
 Dependencies:
     pathlib
+    random
     socket
     time
     PIL
+    tpcheckpoint
+    tpcluster
     tpcrawler
+    tpdlx
     tperrors
+    tpmemo
     tppieces
     tppositions
+    tpprofile
+    tpprogress
+    tpregions
     tpsolutions
 """
 
 from pathlib import Path
+from random import Random
 from socket import gethostname
-from time import strftime, time
+from time import monotonic, strftime, time
 
 from PIL import ImageColor
 
-from tpcrawler import CrawlersCollection
+from tpcheckpoint import Checkpoint
+from tpcluster import Coordinator
+from tpcrawler import CrawlersCollection, usable_cpu_count
+from tpdlx import ExactCover
+from tpmemo import TilingsCounter, burnside_count
 from tperrors import TalosFileSystemError
 from tppieces import PiecesCollection
-from tppositions import PositionsStackCollection
-from tpsolutions import SolutionsCollection
+from tppositions import FLIPS, PositionsStackCollection
+from tpprofile import ProfileCounter
+from tpprogress import Progress
+from tpregions import DeadRegions
+from tpsolutions import (
+    SolutionsClasses,
+    SolutionsCollection,
+    SolutionsCount
+)
+
+STATS_COLUMNS = (
+    "Hostname",
+    "Date",
+    "Id",
+    "Rows",
+    "Columns",
+    "L Right",
+    "L Left",
+    "Step Right",
+    "Step Left",
+    "Tee",
+    "Bar",
+    "Square",
+    "Combinations",
+    "Solutions",
+    "Elapsed Time",
+    "Incomplete",
+    "Tilings",
+    "Classes"
+)
 
 
 class Puzzle(object):
@@ -37,9 +80,50 @@ class Puzzle(object):
         Attributes:
             __verbose: boolean - print verbose messages if True
             __first: boolean - stop after first solution found
+            __count_only: boolean - only count the solutions, without
+                outputting them
+            __sample: integer - # of random tilings to draw instead of
+                searching all the solutions, None if not sampling
+            __estimate: boolean - only estimate the size of the tree and
+                the solve time
             __stats: boolean - save stats in CSV file
+            __engine: string - name of the tree crawler engine
+            __prune: string - dead regions pruning, "size" or "shape", None
+                if none
+            __frontier_memory: integer - memory budget in megabytes of the
+                breadth first levels of the frontier engine
+            __jobs: integer - # of crawler processes, None for usable CPUs
+            __pin: boolean - pin each crawler process to one CPU
+            __split_depth: integer - # of tree levels to split in crawler
+                tasks, None for automatic
+            __memo_size: integer - max # of entries of the memo engine table
+            __tilings: integer - # of tilings counted by the memo or
+                profile engine, None if not counted
+            __unique: integer - # of tilings up to the board symmetries,
+                counted with the tilings, None if not counted
+            __batch_size: integer - # of solutions sent together by a
+                crawler process
+            __flush_interval: float - max # of seconds a solution waits in
+                a crawler batch
+            __checkpoint: string - checkpoint file path, None if none
+            __checkpoint_interval: float - # of seconds between two
+                checkpoints
+            __resume: boolean - resume the solve from the checkpoint file
+            __progress_interval: float - # of seconds between two progress
+                reports
+            __progress_file: string - progress file path, None if none
+            __timeout: float - max # of seconds of solving, None if none
+            __max_nodes: integer - max # of tree nodes crawled, None if none
+            __max_solutions: integer - max # of solutions, None if none
+            __serve: tuple (string, integer) - host and port to serve the
+                crawler tasks to the workers on, None to crawl them locally
+            __authkey: string - authentication key of the workers
+                connections
+            __halted: string - reason of the solve stop before its end
+                (timeout, nodes, solutions or interrupt), None if complete
             __config: string - puzzle configuration in one line
             __save_images: boolean - save solutions PNG images if True
+            __symmetries: boolean - output the symmetrical solutions if True
             __cell_size: integer - size in pixels of a board cell
             __fill_color: RGB tuples of integer - color of the cell
             __shape_color: RGB tuples of integer - color of the cell shape
@@ -48,9 +132,11 @@ class Puzzle(object):
             __board_columns: integer - # of columns on the board
             __pieces: PiecesCollection - collection of pieces
             __positions: PositionsStackCollection - collection of positions
-            __solutions: SolutionsCollection - collection of solutions
+            __solutions: SolutionsCollection - collection of solutions, or
+                SolutionsCount - count of the solutions if only counting
         Methods:
             __print_config: Print puzzle configuration
+            __print_estimate: Print the estimated tree size and solve time
             __save_stats: Save puzzle solving statistics to CSV file
     Public members:
         Methods:
@@ -77,8 +163,45 @@ class Puzzle(object):
         self.__verbose = args.verbose
         # Do we stop at first solution found
         self.__first = args.first
+        # Do we only count the solutions
+        self.__count_only = args.count_only
+        # Do we draw random tilings
+        self.__sample = args.sample
+        # Do we only estimate the solve
+        self.__estimate = args.estimate
         # Do we save puzzle solving statistics
         self.__stats = args.stats
+        # Tree crawler engine
+        self.__engine = args.engine
+        # Dead regions pruning
+        self.__prune = args.prune
+        self.__frontier_memory = args.frontier_memory
+        # Crawler processes pool
+        self.__jobs = args.jobs
+        self.__pin = args.pin
+        self.__split_depth = args.split_depth
+        # Tilings count of the memo and profile engines
+        self.__memo_size = args.memo_size
+        self.__tilings = None
+        self.__unique = None
+        # Solutions transport from the crawler processes
+        self.__batch_size = args.batch_size
+        self.__flush_interval = args.flush_interval
+        # Checkpoint and resume of the solve
+        self.__checkpoint = args.checkpoint
+        self.__checkpoint_interval = args.checkpoint_interval
+        self.__resume = args.resume
+        # Progress reports
+        self.__progress_interval = args.progress_interval
+        self.__progress_file = args.progress_file
+        # Solve budget
+        self.__timeout = args.timeout
+        self.__max_nodes = args.max_nodes
+        self.__max_solutions = args.max_solutions
+        self.__halted = None
+        # Distributed solve
+        self.__serve = args.serve
+        self.__authkey = args.authkey
         # Puzzle configuration for stats output
         self.__config = (
             "{:0>2},{:0>2},{:0>2},{:0>2},{:0>2},{:0>2},{:0>2},{:0>2},{:0>2}"
@@ -96,6 +219,7 @@ class Puzzle(object):
         )
         # Images output
         self.__save_images = args.images
+        self.__symmetries = args.symmetries
         self.__cell_size = args.cell_size
         self.__fill_color = ImageColor.getrgb(args.fill_color)
         self.__shape_color = ImageColor.getrgb(args.shape_color)
@@ -140,8 +264,13 @@ class Puzzle(object):
 
         return self.__board_columns
 
-    def __print_config(self):
-        """Print puzzle configuration"""
+    def __print_config(self, roots_piece):
+        """Print puzzle configuration
+
+        Inputs:
+            roots_piece: Piece - piece whose positions are restricted by the
+                board symmetries, None if none
+        """
 
         print(
             "Info: Puzzle board is {} rows x {} columns (size = {})"
@@ -162,6 +291,15 @@ class Puzzle(object):
             .format(self.__positions.combinations_count)
             .replace(",", " ")
         )
+        if roots_piece:
+            print(
+                "Info: Board symmetries restrict {} to {} of {} positions"
+                .format(
+                    roots_piece.name,
+                    len(self.__positions.roots),
+                    len(self.__positions[0])
+                )
+            )
         if self.__save_images:
             print(
                 "Info: Solutions image will be generated in {} with a cell "
@@ -169,6 +307,40 @@ class Puzzle(object):
                 .format(self.__output_dir, self.__cell_size)
             )
 
+    def __print_estimate(self, crawlers):
+        """Print the estimated # of tree nodes to crawl and solve time, with
+        their 95% confidence intervals
+
+        Inputs:
+            crawlers: CrawlersCollection - crawlers pool of the solve
+        """
+
+        generator = Random()
+        nodes, low, high, probes = crawlers.estimate(generator)
+        rate = crawlers.calibrate(generator)
+        jobs = self.__jobs or usable_cpu_count()
+        print(
+            "Estimated tree size: {} nodes (95% confidence: {} to {}), from "
+            "{} probes"
+            .format(
+                *("{:,.0f}".format(value).replace(",", " ")
+                  for value in (nodes, low, high, probes))
+            )
+        )
+        if not rate:
+            return
+        print(
+            "Estimated solve time: {} s with {} crawlers (95% confidence: {}"
+            " to {} s), at {} nodes/s per crawler"
+            .format(
+                "{:,.1f}".format(nodes / rate / jobs).replace(",", " "),
+                jobs,
+                "{:,.1f}".format(low / rate / jobs).replace(",", " "),
+                "{:,.1f}".format(high / rate / jobs).replace(",", " "),
+                "{:,.0f}".format(rate).replace(",", " ")
+            )
+        )
+
     def __save_stats(self, time_spend):
         """Save puzzle solving statistics to CSV file
 
@@ -191,31 +363,44 @@ class Puzzle(object):
             + ","
             + str(self.__positions.combinations_count)
             + ","
-            + str(len(self.__solutions))
+            + (str(len(self.__solutions)) if self.__tilings is None else "")
             + ","
             + time_spend
+            + ","
+            + (self.__halted or "")
+            + ","
+            + (str(self.__tilings) if self.__tilings is not None else "")
+            + ","
+            + (str(self.__unique) if self.__unique is not None else "")
             + "\n"
         )
-        if not stats_file.is_file():
+        header = ",".join(STATS_COLUMNS) + "\n"
+        try:
+            lines = []
+            if stats_file.is_file():
+                with stats_file.open() as f:
+                    lines = f.readlines()
+        except OSError as err:
+            message = "Error: Can't read stats file " + str(stats_file)
+            raise TalosFileSystemError(message, err)
+        # Keep the separator hint line of the spreadsheets, if any
+        separator = lines[:1] if lines and lines[0].startswith("sep=") else []
+        lines = lines[len(separator):]
+        if not lines or lines[0] != header:
+            # New file, or file of a previous version with less columns:
+            # rewrite it with the current header, the previous lines having
+            # the new columns empty
+            rows = [
+                line.rstrip("\n")
+                + "," * (len(STATS_COLUMNS) - 1 - line.count(","))
+                + "\n"
+                for line in lines[1:]
+            ]
             try:
                 with stats_file.open("w") as f:
-                    f.write(
-                        "Hostname,"
-                        "Date,"
-                        "Id,"
-                        "Rows,"
-                        "Columns,"
-                        "L Right,"
-                        "L Left,"
-                        "Step Right,"
-                        "Step Left,"
-                        "Tee,"
-                        "Bar,"
-                        "Square,"
-                        "Combinations,"
-                        "Solutions,"
-                        "Elapsed Time\n"
-                    )
+                    f.writelines(separator)
+                    f.write(header)
+                    f.writelines(rows)
                     f.write(stats_line)
             except OSError as err:
                 message = "Error: Can't create stats file " + str(stats_file)
@@ -238,8 +423,13 @@ class Puzzle(object):
         # Append to pieces collection
         self.__pieces.append(piece)
 
-    def solve(self):
-        """Solve the puzzle"""
+    def solve(self, engine=None):
+        """Solve the puzzle, or only print the estimate of the solve
+
+        Inputs:
+            engine: string, optional, None - name of the tree crawler engine,
+                overrides the command line engine
+        """
 
         # Generate positions tree
         for piece in self.__pieces:
@@ -250,34 +440,247 @@ class Puzzle(object):
             )
         # Optimize positions tree
         self.__positions.optimize()
+        # Search only one solution of each class of symmetrical solutions
+        roots_piece = self.__positions.break_symmetries()
+        # Count the classes of solutions instead of collecting them
+        classes = None
+        if self.__count_only:
+            classes = SolutionsClasses(
+                self.__positions,
+                self.__board_rows,
+                self.__board_columns
+            )
+            self.__solutions = SolutionsCount(classes)
         # Print config if needed
         if self.__verbose:
-            self.__print_config()
+            self.__print_config(roots_piece)
         # Start crawling the tree
         start = time()
         # Maximum depth to reach in the tree (one level before the last one)
         max_depth = len(self.__pieces) - 2
-        if max_depth < 0 and self.__positions.combinations_count > 0:
+        if self.__sample:
+            # Uniformly random tilings, drawn with the memoized counts of
+            # the tilings, in the main process
+            counter = TilingsCounter(
+                self.__positions,
+                self.__board_rows,
+                self.__board_columns,
+                self.__memo_size
+            )
+            generator = Random()
+            try:
+                for _ in range(self.__sample):
+                    tree_path = counter.sample(generator)
+                    if tree_path is None:
+                        break
+                    self.__solutions.add(tree_path)
+            except KeyboardInterrupt:
+                self.__halted = "interrupt"
+            if self.__verbose:
+                print(
+                    "Info: Tilings drawn among {} tilings"
+                    .format(
+                        "{:,d}".format(counter.count()).replace(",", " ")
+                    )
+                )
+        elif (engine or self.__engine) == "profile":
+            # Broken profile count of the tilings, in the main process
+            counter = ProfileCounter(
+                self.__positions,
+                self.__board_rows,
+                self.__board_columns
+            )
+            try:
+                self.__tilings = counter.count()
+            except KeyboardInterrupt:
+                self.__halted = "interrupt"
+                self.__tilings = 0
+            if self.__verbose:
+                print(
+                    "Info: Broken profile scan with at most {} states"
+                    .format(
+                        "{:,d}".format(counter.max_states).replace(",", " ")
+                    )
+                )
+        elif (engine or self.__engine) == "memo":
+            # Memoized count of the tilings, in the main process
+            counter = TilingsCounter(
+                self.__positions,
+                self.__board_rows,
+                self.__board_columns,
+                self.__memo_size
+            )
+            try:
+                self.__tilings = counter.count()
+            except KeyboardInterrupt:
+                self.__halted = "interrupt"
+                self.__tilings = 0
+            if self.__verbose:
+                print(
+                    "Info: Memo table {} hits, {} misses ({:.1%} hit rate), "
+                    "{} evictions"
+                    .format(
+                        "{:,d}".format(counter.hits).replace(",", " "),
+                        "{:,d}".format(counter.misses).replace(",", " "),
+                        counter.hit_rate,
+                        "{:,d}".format(counter.evictions).replace(",", " ")
+                    )
+                )
+        elif max_depth < 0 and self.__positions.combinations_count > 0:
             # We have only one piece (a square or a bar) with one position and
             # at least one. Then we have all the solutions
             self.__solutions.add([(0, 0)])
+        elif (engine or self.__engine) == "dlx":
+            # Exact cover solver, in the main process
+            exact_cover = ExactCover(
+                self.__positions,
+                self.__board_rows,
+                self.__board_columns
+            )
+            # The budget is checked between two solutions, the exact cover
+            # solver has no tree nodes count
+            deadline = None
+            if self.__timeout is not None:
+                deadline = monotonic() + self.__timeout
+            try:
+                for tree_path in exact_cover.solve():
+                    self.__solutions.add(tree_path)
+                    if self.__first:
+                        break
+                    if (self.__max_solutions is not None
+                            and len(self.__solutions) >= self.__max_solutions):
+                        self.__halted = "solutions"
+                        break
+                    if deadline is not None and monotonic() >= deadline:
+                        self.__halted = "timeout"
+                        break
+            except KeyboardInterrupt:
+                self.__halted = "interrupt"
         else:
+            # Dead regions pruning
+            regions = None
+            if self.__prune:
+                regions = DeadRegions(
+                    self.__positions,
+                    self.__board_rows,
+                    self.__board_columns,
+                    self.__prune == "shape"
+                )
             # Collection of crawler subprocesses
             crawlers = CrawlersCollection(
                 self.__positions,
                 max_depth,
-                self.__first
+                self.__first,
+                engine or self.__engine,
+                self.__jobs,
+                self.__pin,
+                self.__split_depth,
+                regions,
+                self.__batch_size,
+                self.__flush_interval,
+                self.__timeout,
+                self.__max_nodes,
+                self.__max_solutions,
+                classes,
+                self.__frontier_memory
             )
-            # Each position of the first piece is a tree root
-            for position_idx in range(len(self.__positions[0])):
-                # Init tree path with root node
-                tree_path = [(0, position_idx)]
-                # Add crawler to the collection
-                crawlers.add(tree_path)
-            # Start the crawlers
-            crawlers.start()
-            # Get the solutions
-            crawlers.get_solutions(self.__solutions)
+            # Only estimate the solve, without crawling the tree
+            if self.__estimate:
+                self.__print_estimate(crawlers)
+                return
+            # Resume the tasks not finished and the solutions of the
+            # checkpoint, if any
+            checkpoint = None
+            tasks = None
+            if self.__checkpoint:
+                checkpoint = Checkpoint(
+                    self.__checkpoint,
+                    self.__config + "," + (engine or self.__engine),
+                    self.__checkpoint_interval
+                )
+                state = checkpoint.load() if self.__resume else None
+                if state:
+                    tasks, tree_paths = state
+                    for tree_path in tree_paths:
+                        self.__solutions.add(tree_path)
+                    if self.__verbose:
+                        print(
+                            "Info: Resuming {} tasks with {} solutions"
+                            .format(len(tasks), len(self.__solutions))
+                        )
+            # One crawler per tree root of the engine
+            if tasks is None:
+                for tree_path in crawlers.roots():
+                    crawlers.add(tree_path)
+            if self.__verbose and (engine or self.__engine) == "bitset":
+                print(
+                    "Info: Compatible positions bitsets use {:,d} bytes"
+                    .format(crawlers.table.memory).replace(",", " ")
+                )
+            if self.__serve:
+                # The workers crawl the tasks served by the coordinator
+                coordinator = Coordinator(
+                    crawlers,
+                    engine or self.__engine,
+                    max_depth,
+                    self.__first,
+                    self.__serve,
+                    self.__authkey,
+                    self.__batch_size,
+                    self.__flush_interval,
+                    classes,
+                    self.__jobs
+                )
+                coordinator.serve(self.__solutions, self.__verbose)
+                if coordinator.incomplete:
+                    self.__halted = "interrupt"
+                if self.__verbose:
+                    print(
+                        "Info: {} tasks served again after a lost worker"
+                        .format(coordinator.lost)
+                    )
+            else:
+                # Start the crawlers
+                # Progress reports, if needed
+                progress = None
+                if self.__verbose or self.__progress_file:
+                    progress = Progress(
+                        self.__progress_interval,
+                        self.__verbose,
+                        self.__progress_file
+                    )
+                crawlers.start(tasks)
+                # Get the solutions
+                crawlers.get_solutions(self.__solutions, checkpoint, progress)
+                if crawlers.incomplete:
+                    self.__halted = crawlers.halted or "crawlers"
+                if self.__verbose and regions:
+                    print(
+                        "Info: Dead regions pruning cut {:,d} branches"
+                        .format(crawlers.pruned).replace(",", " ")
+                    )
+        if self.__tilings is not None and not self.__halted:
+            # Tilings up to the board symmetries, by the Burnside's lemma
+            try:
+                self.__unique, fixed = burnside_count(
+                    self.__positions,
+                    self.__board_rows,
+                    self.__board_columns,
+                    self.__tilings,
+                    self.__memo_size
+                )
+            except KeyboardInterrupt:
+                self.__halted = "interrupt"
+                fixed = {}
+            if self.__verbose:
+                for flip, count in fixed.items():
+                    print(
+                        "Info: {} tilings fixed by the {} symmetry"
+                        .format(
+                            "{:,d}".format(count).replace(",", " "),
+                            FLIPS[flip]
+                        )
+                    )
         stop = time()
         if self.__verbose:
             print(
@@ -296,19 +699,64 @@ class Puzzle(object):
     def solutions(self):
         """Output and save the solutions if we have some"""
 
+        # Report the tilings count of the memo and profile engines
+        if self.__tilings is not None:
+            message = (
+                "Counted {} tilings, symmetrical ones included"
+                .format(self.__tilings)
+            )
+            if self.__unique is not None:
+                message += (
+                    ", {} up to the board symmetries".format(self.__unique)
+                )
+            if self.__halted:
+                message += " (incomplete: interrupt)"
+            print(message)
+            return
+        # Report the solutions count only
+        if self.__count_only:
+            message = (
+                "Counted {} unique solutions".format(len(self.__solutions))
+            )
+            if self.__halted:
+                message += " (incomplete: {})".format(self.__halted)
+            print(message)
+            return
         # Report solutions
         if len(self.__solutions) != 0:
             if self.__first:
                 message = "Puzzle solved !"
+            elif self.__sample:
+                message = (
+                    "Puzzle sampled ! Drew {} unique solutions from {} random"
+                    " tilings".format(len(self.__solutions), self.__sample)
+                )
+                if self.__halted:
+                    message += " (incomplete: {})".format(self.__halted)
+            elif self.__halted:
+                message = (
+                    "Puzzle partially solved ! Found {} unique solutions "
+                    "(incomplete: {})"
+                    .format(len(self.__solutions), self.__halted)
+                )
             else:
                 message = (
                     "Puzzle solved ! Found {} unique solutions"
                     .format(len(self.__solutions))
                 )
             print(message)
+            # Symmetrical solutions are generated on demand
+            if self.__symmetries:
+                self.__solutions.add_symmetries(self.__positions.symmetries)
             self.__solutions.echo()
         else:
-            print("No solution found for the puzzle !")
+            if self.__halted:
+                print(
+                    "No solution found for the puzzle before the solve stop"
+                    " (incomplete: {})".format(self.__halted)
+                )
+            else:
+                print("No solution found for the puzzle !")
             exit(0)
         # Save images if needed
         if self.__save_images:
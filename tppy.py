@@ -36,8 +36,54 @@ Comments:
 Command line arguments:
     --verbose: Print progress status on stdout (toggle, default: false)
     --first: Stop at first solution found (toggle, default: false)
+    --count-only: Only count the solutions, without outputting them
+        (toggle, default: false)
+    --sample #: Draw # uniformly random tilings instead of searching all the
+        solutions (default: none)
+    --estimate: Print the estimated size of the tree and solve time, without
+        solving the puzzle (toggle, default: false)
     --stats: Save puzzle solving statistics in CSV format
         (toggle, default: false)
+    --engine name: Solver engine, "numpy", "iterative", "bitboard", "cell",
+        "bitset", "frontier", "dlx", "memo" or "profile" (default: "numpy")
+    --memo-size #: Maximum number of entries of the memo engine table
+        (default: 1000000)
+    --prune mode: Prune the partial boards leaving empty regions whose size
+        is not a multiple of 4 ("size"), or which can't be filled by a
+        remaining piece ("shape"), bitboard, cell and frontier engines only
+        (default: none)
+    --frontier-memory #: Memory budget in megabytes of the breadth first
+        levels of the frontier engine, per crawler (default: 64)
+    --jobs #: Number of crawler processes, or of worker processes expected
+        when serving (default: usable CPU count, 64 when serving)
+    --pin: Pin each crawler process to one CPU (toggle, default: false)
+    --split-depth #: Number of tree levels to split in crawler tasks
+        (default: automatic)
+    --batch-size #: Number of solutions sent together by a crawler process
+        (default: 64)
+    --flush-interval #: Maximum number of seconds a solution waits in a
+        crawler batch (default: 1.0)
+    --checkpoint file: Save periodically the crawler tasks not finished and
+        the solutions found in the file (default: none)
+    --checkpoint-interval #: Number of seconds between two checkpoints
+        (default: 60)
+    --resume: Resume the solve from the checkpoint file, if it exists
+        (toggle, default: false)
+    --progress-interval #: Number of seconds between two progress reports,
+        printed in verbose mode (default: 10)
+    --progress-file file: Append the progress reports to the file as JSON
+        lines (default: none)
+    --timeout #: Stop the solve after # seconds and output the solutions
+        found so far (default: no limit)
+    --max-nodes #: Stop the solve after # tree nodes crawled and output the
+        solutions found so far, crawler engines only (default: no limit)
+    --max-solutions #: Stop the solve after # solutions found (default: no
+        limit)
+    --serve host:port: Serve the crawler tasks to the workers connecting on
+        host:port instead of crawling them, crawler engines only
+        (default: none)
+    --authkey key: Authentication key of the workers connections
+        (default: "talospuzzle")
     --rows #: Number of board rows (mandatory, no default)
     --columns #: Number of board columns (mandatory, no default)
     --square #: Number of Square shape pieces (default: 0)
@@ -48,6 +94,8 @@ Command line arguments:
     --step-right #: Number of Step right shape pieces (default: 0)
     --step-left #: Number of Step left shape pieces (default: 0)
     --images: Output solutions as png images (toggle, default: false)
+    --symmetries: Output the symmetrical solutions of each solution
+        (toggle, default: false)
     --output-dir dir: Directory where to output png images
         (default: application dir)
     --cell-size #: Size in pixels of one cell of the board (default: 100)
@@ -55,6 +103,11 @@ Command line arguments:
         (default: "Yellow")
     --fill-color colorname: Color name (HTML) of the fill color
         (default: "DatkMagenta")
+Worker command line arguments (tppy.py worker):
+    --connect host:port: Address of the coordinator (mandatory, no default)
+    --jobs #: Number of worker processes (default: usable CPU count)
+    --authkey key: Authentication key of the connection
+        (default: "talospuzzle")
 Functions:
     main: application main function
 Attributes:
@@ -65,17 +118,25 @@ Attributes:
     __license__: string
 Dependencies:
     multiprocessing
+    sys
+    tpcluster
     tpparam
     tppieces
     tppuzzle
 """
 
 import multiprocessing as mp
+import sys
 
-from tpparam import TalosArguments
+from tpcluster import start_workers
+from tpparam import TalosArguments, WorkerArguments
 from tppieces import pieces_set
 from tppuzzle import Puzzle
-from tperrors import TalosArgumentError, TalosFileSystemError
+from tperrors import (
+    TalosArgumentError,
+    TalosFileSystemError,
+    TalosNetworkError
+)
 
 __version__ = "3.0"
 __date__ = "2018-05-23"
@@ -85,7 +146,19 @@ __license__ = "LGPL-3.0"
 
 
 def main():
-    """Create puzzle, add pieces, solve and display solutions"""
+    """Create puzzle, add pieces, solve and display solutions, or start the
+    workers of a distributed solve
+    """
+
+    # Worker command
+    if sys.argv[1:2] == ["worker"]:
+        try:
+            args = WorkerArguments(sys.argv[2:])
+        except TalosArgumentError as err:
+            print("Argument error: {} - {}".format(err.argument, err.message))
+            exit(1)
+        start_workers(args().connect, args().authkey, args().jobs)
+        return
 
     # Get puzzle parameters from command line
     try:
@@ -116,8 +189,12 @@ def main():
     # Solve the puzzle
     try:
         puzzle.solve()
-    except TalosFileSystemError as err:
+    except (TalosFileSystemError, TalosNetworkError) as err:
         print(err.message, " with system error: ", err.syserror)
+        exit(1)
+    # Only the estimate is printed, the puzzle is not solved
+    if args().estimate:
+        exit(0)
 
     # Print the solutions and save the images if needed
     try:
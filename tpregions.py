@@ -0,0 +1,125 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+"""Dead regions detection on partial boards
+
+Name: tpregions.py
+Comments:
+    A region is a set of connected empty cells of a partial board (cells
+    sharing a side). As all the pieces have 4 cells, a region whose size is
+    not a multiple of 4 can't be filled: the partial board is a dead branch.
+    A region of 4 cells can only be filled if it's a position of one of the
+    remaining pieces.
+Classes:
+    DeadRegions: dead regions detection on bitmask boards
+Dependencies:
+    None
+"""
+
+
+class DeadRegions(object):
+    """Dead regions detection on bitmask boards (bit row * columns + column
+    set for each covered cell)
+
+    Public members:
+        Properties:
+            cut: integer - # of partial boards detected as dead
+        Methods:
+            dead: test if a partial board has a dead region
+            reset: reset the count of dead partial boards
+    Private members:
+        Attributes:
+            __columns: integer - # of columns of the board
+            __full: integer - bitmask of the full board
+            __not_first_column: integer - bitmask of the board without its
+                first column
+            __not_last_column: integer - bitmask of the board without its
+                last column
+            __shapes: list of sets of integers - positions bitmasks of each
+                stack, None if the regions shapes are not checked
+            __cut: integer - # of partial boards detected as dead
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, positions, board_rows, board_columns, shapes=False):
+        """Prepare the board bitmasks and the positions shapes
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions
+            board_rows: integer - # rows of the puzzle
+            board_columns: integer - # columns of the puzzle
+            shapes: boolean - check the regions of 4 cells against the
+                positions of the remaining pieces
+        """
+
+        self.__columns = board_columns
+        self.__full = (1 << (board_rows * board_columns)) - 1
+        first_column = 0
+        for row in range(board_rows):
+            first_column |= 1 << (row * board_columns)
+        last_column = first_column << (board_columns - 1)
+        self.__not_first_column = self.__full & ~first_column
+        self.__not_last_column = self.__full & ~last_column
+        self.__shapes = None
+        if shapes:
+            # Copies of a piece share the same set of positions
+            self.__shapes = []
+            for stack_idx, copy in enumerate(positions.copies):
+                if copy:
+                    self.__shapes.append(self.__shapes[-1])
+                else:
+                    self.__shapes.append(set(positions[stack_idx].masks))
+        self.__cut = 0
+
+    @property
+    def cut(self):
+        """integer - # of partial boards detected as dead"""
+
+        return self.__cut
+
+    def reset(self):
+        """Reset the count of dead partial boards"""
+
+        self.__cut = 0
+
+    def dead(self, board, remaining):
+        """Test if a partial board has a dead region: a region whose size is
+        not a multiple of 4 or, if the shapes are checked, a region of 4
+        cells which is not a position of a remaining piece
+
+        Inputs:
+            board: integer - partial board bitmask
+            remaining: iterable of integers - stacks of the remaining pieces
+        Return: boolean - True if the partial board has a dead region
+        """
+
+        columns = self.__columns
+        not_first_column = self.__not_first_column
+        not_last_column = self.__not_last_column
+        empty = self.__full & ~board
+        while empty:
+            # Flood fill the region of the first empty cell
+            region = empty & -empty
+            while True:
+                grown = (
+                    region
+                    | ((region << 1) & not_first_column)
+                    | ((region >> 1) & not_last_column)
+                    | (region << columns)
+                    | (region >> columns)
+                ) & empty
+                if grown == region:
+                    break
+                region = grown
+            empty &= ~region
+            size = bin(region).count("1")
+            if size % 4:
+                self.__cut += 1
+                return True
+            if size == 4 and self.__shapes is not None:
+                if not any(region in self.__shapes[stack_idx]
+                           for stack_idx in remaining):
+                    self.__cut += 1
+                    return True
+        return False
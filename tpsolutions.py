@@ -6,11 +6,17 @@ Name: tpsolutions.py
 Classes:
     SolutionsCollection: collection of Solutions - solutions of the puzzle
     Solution: solution description
+    SolutionsClasses: classes of equal solutions
+    SolutionsCount: count of the classes of solutions
 Dependencies:
+    fractions
+    math
     PIL
     tperrors
 """
 
+from fractions import Fraction
+from math import ceil
 
 from PIL import Image, ImageDraw
 
@@ -23,6 +29,7 @@ class SolutionsCollection(object):
     Public members:
         Methods:
             add: create and append a solution to the collection
+            add_symmetries: create the symmetrical solutions of each solution
             echo: output all solutions on the console
             draw: generate PNG images of all solutions
             save: generated PNG images
@@ -111,11 +118,50 @@ class SolutionsCollection(object):
         if solution not in self.__stack:
             self.__stack.append(solution)
 
+    def add_symmetries(self, symmetries):
+        """Create the symmetrical solutions of each solution, which are
+        different from the solution
+
+        Inputs:
+            symmetries: list of integers - board symmetries (FLIPS indexes)
+                which transform any solution in another solution
+        """
+
+        for solution in self.__stack:
+            for flip in symmetries:
+                tree_path = [
+                    (
+                        piece_idx,
+                        self.__positions[piece_idx].flips[position_idx][flip]
+                    )
+                    for piece_idx, position_idx in solution.path
+                ]
+                symmetric = Solution(
+                    self.__positions,
+                    self.__board_rows,
+                    self.__board_columns,
+                    tree_path
+                )
+                labels = [solution.solution_label] + [
+                    other.solution_label for other in solution.symmetrics
+                ]
+                if symmetric.solution_label not in labels:
+                    solution.symmetrics.append(symmetric)
+
     def echo(self):
-        """Output the solutions on stdout"""
+        """Output the solutions on stdout, with their symmetrical
+        solutions
+        """
 
         for solution_idx, solution in enumerate(self.__stack, 1):
             print("Solution {}:".format(solution_idx), solution, sep="\n")
+            for symmetric_idx, symmetric in enumerate(solution.symmetrics, 1):
+                print(
+                    "Solution {} (symmetrical {}):"
+                    .format(solution_idx, symmetric_idx),
+                    symmetric,
+                    sep="\n"
+                )
 
     def draw(self, cell_size, fill_color, shape_color):
         """Draw all solutions as PNG images
@@ -128,6 +174,8 @@ class SolutionsCollection(object):
 
         for solution in self.__stack:
             solution.draw(cell_size, fill_color, shape_color)
+            for symmetric in solution.symmetrics:
+                symmetric.draw(cell_size, fill_color, shape_color)
 
     def save(self, output_dir):
         """Save all solutions as PNG images, in the given directory.
@@ -140,14 +188,22 @@ class SolutionsCollection(object):
 
         # Save all images
         for solution_idx, solution in enumerate(self.__stack, 1):
-            if solution.image:
+            images = [
+                (solution, "Solution #{:0>2}.png".format(solution_idx))
+            ]
+            for symmetric_idx, symmetric in enumerate(solution.symmetrics, 1):
+                images.append((
+                    symmetric,
+                    "Solution #{:0>2}-{}.png"
+                    .format(solution_idx, symmetric_idx)
+                ))
+            for image_solution, image_file in images:
+                if not image_solution.image:
+                    continue
                 # Image filename
-                image_name = (
-                    output_dir
-                    / "Solution #{:0>2}.png".format(solution_idx)
-                )
+                image_name = output_dir / image_file
                 try:
-                    solution.image.save(str(image_name))
+                    image_solution.image.save(str(image_name))
                 except Exception as err:
                     message = "Can't save image {}".format(str(image_name))
                     raise TalosFileSystemError(message, err)
@@ -170,6 +226,7 @@ class Solution(object):
                 of pieces
             __solutions_pieces: list of list of integer - the solution with
                 index of pieces
+            __symmetrics: list of Solution - symmetrical solutions
     Special methods:
         __init__: override object constructor
         __str__: the solution in a string
@@ -182,6 +239,7 @@ class Solution(object):
             pieces
         solutions_pieces: list of list of integer - the solution with index of
             pieces
+        symmetrics: list of Solution - symmetrical solutions, if requested
     """
 
     def __init__(self, positions, board_rows, board_columns, tree_path):
@@ -196,6 +254,7 @@ class Solution(object):
                 of the solution
         """
         self.__image = None
+        self.__symmetrics = []
         self.__board_rows = board_rows
         self.__board_columns = board_columns
         self.__solution_path = tree_path.copy()
@@ -281,6 +340,12 @@ class Solution(object):
 
         return self.__solution_pieces
 
+    @property
+    def symmetrics(self):
+        """List of Solution - symmetrical solutions, if requested"""
+
+        return self.__symmetrics
+
     def draw(self, cell_size, fill_color, shape_color):
         """Draw all solutions as PNG images
 
@@ -336,3 +401,218 @@ class Solution(object):
                     x1 = (col + 1) * cell_size - 1
                     y1 = y0
                     draw.line([(x0, y0), (x1, y1)], shape_color, 2)
+
+
+class SolutionsClasses(object):
+    """Classes of equal solutions, as compared by the solutions collection:
+    solutions whose labels grids are equal up to a flip of the board. The
+    crawlers find several solutions of a class when its labels grids are
+    filled by several tilings with a first stack position in the tree roots
+    (symmetric root position, pieces of the same label laid out in different
+    ways, flips of the board keeping the shape of the chiral pieces). The
+    number of solutions found in the class of a solution is computed from
+    the solution alone, so that counting 1 / members for each solution found
+    counts the classes without comparing the solutions.
+
+    Public members:
+        Methods:
+            members: # of solutions found in the class of a solution
+    Private members:
+        Attributes:
+            __labels: list of tuples (string, list of integers) - label of
+                the piece and positions bitmasks of each stack
+            __types: dict of tuples (integer, dict of list of integers) - #
+                of pieces and positions bitmasks by lowest cell, by label
+            __roots: tuple (string, set of integers) - label of the first
+                stack and bitmasks of its tree roots positions, None if the
+                tree roots aren't restricted
+            __flips: list of list of integers - cell of each cell of the
+                board by each of the board flips
+            __cells: integer - # of cells of the board
+    Special methods:
+        __init__: override object constructor
+    """
+
+    def __init__(self, positions, board_rows, board_columns):
+        """Override object constructor
+
+        Inputs:
+            positions: PositionsStackCollection - puzzle collection of
+                positions, with the tree roots restricted if needed
+            board_rows: integer - # rows of the puzzle
+            board_columns: integer - # columns of the puzzle
+        """
+
+        self.__labels = [
+            (positions[stack_idx].piece.label, positions[stack_idx].masks)
+            for stack_idx in range(len(positions))
+        ]
+        self.__types = {}
+        for label, masks in self.__labels:
+            count, by_cell = self.__types.get(label, (0, None))
+            if by_cell is None:
+                by_cell = {}
+                for mask in masks:
+                    lowest = (mask & -mask).bit_length() - 1
+                    by_cell.setdefault(lowest, []).append(mask)
+            self.__types[label] = (count + 1, by_cell)
+        self.__roots = None
+        if len(positions.roots) < len(positions[0].masks):
+            self.__roots = (
+                self.__labels[0][0],
+                {positions[0].masks[root] for root in positions.roots}
+            )
+        self.__cells = board_rows * board_columns
+        cells = [
+            (row, column)
+            for row in range(board_rows)
+            for column in range(board_columns)
+        ]
+        self.__flips = [
+            [
+                (board_rows - 1 - row) * board_columns + column
+                for row, column in cells
+            ],
+            [
+                row * board_columns + board_columns - 1 - column
+                for row, column in cells
+            ],
+            [
+                (board_rows - 1 - row) * board_columns
+                + board_columns - 1 - column
+                for row, column in cells
+            ]
+        ]
+
+    def __partitions(self, region, by_cell):
+        """# of ways to fill a region of the board with positions of a piece
+
+        Inputs:
+            region: integer - bitmask of the region
+            by_cell: dict of list of integers - positions bitmasks of the
+                piece by lowest cell
+        Return: integer - # of ways to fill the region
+        """
+
+        if not region:
+            return 1
+        lowest = (region & -region).bit_length() - 1
+        return sum(
+            self.__partitions(region ^ mask, by_cell)
+            for mask in by_cell.get(lowest, ())
+            if mask & region == mask
+        )
+
+    def __tilings(self, grid):
+        """# of tilings filling a labels grid, found by the crawlers
+
+        Inputs:
+            grid: tuple of strings - label of each cell of the board
+        Return: integer - # of tilings with a first stack position in the
+            tree roots
+        """
+
+        regions = {}
+        for cell, label in enumerate(grid):
+            regions[label] = regions.get(label, 0) | 1 << cell
+        tilings = 1
+        for label, (count, by_cell) in self.__types.items():
+            region = regions.get(label, 0)
+            if self.__roots and label == self.__roots[0]:
+                # Only piece of its label, in a tree root position
+                tilings *= region in self.__roots[1]
+            else:
+                tilings *= self.__partitions(region, by_cell)
+            if not tilings:
+                break
+        return tilings
+
+    def members(self, tree_path):
+        """# of solutions found by the crawlers in the class of a solution
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - solution
+                tree path
+        Return: integer - # of solutions of the class, the solution included
+        """
+
+        grid = [""] * self.__cells
+        for piece_idx, position_idx in tree_path:
+            label, masks = self.__labels[piece_idx]
+            mask = masks[position_idx]
+            while mask:
+                lowest = mask & -mask
+                grid[lowest.bit_length() - 1] = label
+                mask ^= lowest
+        grids = {tuple(grid)}
+        for flip in self.__flips:
+            grids.add(tuple(grid[cell] for cell in flip))
+        return sum(self.__tilings(flipped) for flipped in grids)
+
+
+class SolutionsCount(object):
+    """Count of the classes of solutions of the puzzle, without the
+    solutions. Each solution found counts for 1 / # of solutions found in
+    its class, so the count is the length of the solutions collection of the
+    same solve.
+
+    Public members:
+        Methods:
+            add: count a solution
+            add_tally: count a tally of solutions
+        Properties:
+            classes: SolutionsClasses - classes of equal solutions
+    Private members:
+        Attributes:
+            __classes: SolutionsClasses - classes of equal solutions
+            __count: Fraction - # of classes of the solutions counted
+    Special methods:
+        __init__: override object constructor
+        __len__: provide len method, # of classes of solutions counted
+    """
+
+    def __init__(self, classes):
+        """Override object constructor
+
+        Inputs:
+            classes: SolutionsClasses - classes of equal solutions
+        """
+
+        self.__classes = classes
+        self.__count = Fraction(0)
+
+    def __len__(self):
+        """Provide len method, # of classes of solutions counted
+
+        Return: integer - # of classes, rounded up if the solve was stopped
+            before finding all the solutions of a class
+        """
+
+        return ceil(self.__count)
+
+    @property
+    def classes(self):
+        """SolutionsClasses - classes of equal solutions"""
+
+        return self.__classes
+
+    def add(self, tree_path):
+        """Count a solution
+
+        Inputs:
+            tree_path: list of integer tuples (piece, position) - solution
+                tree path
+        """
+
+        self.__count += Fraction(1, self.__classes.members(tree_path))
+
+    def add_tally(self, tally):
+        """Count a tally of solutions
+
+        Inputs:
+            tally: tuple of integer tuples (members, count) - # of solutions
+                found by # of solutions in their class
+        """
+
+        for members, count in tally:
+            self.__count += Fraction(count, members)